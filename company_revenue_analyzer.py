@@ -21,9 +21,14 @@ Usage:
 
 import sys
 import argparse
+import logging
+import csv
+import orjson
 import time
+from collections import Counter
 from pathlib import Path
-from src.processors.csv_processor import CompanyRevenueProcessor
+from tqdm import tqdm
+from tqdm.contrib.logging import logging_redirect_tqdm
 from src.config.settings import Config
 
 
@@ -52,6 +57,10 @@ Examples:
     python company_revenue_analyzer.py companies.csv
     python company_revenue_analyzer.py companies.csv results
     python company_revenue_analyzer.py companies.csv --delay 3.0
+    python company_revenue_analyzer.py companies.csv --workers 8
+    python company_revenue_analyzer.py companies.csv --batch-size 5
+    python company_revenue_analyzer.py companies.csv --yes
+    python company_revenue_analyzer.py companies.csv --resume
         """
     )
     
@@ -69,8 +78,41 @@ Examples:
     parser.add_argument(
         "--delay",
         type=float,
-        default=2.0,
-        help="Delay in seconds between company processing (default: 2.0)"
+        default=None,
+        help="Minimum delay in seconds between starting batches; API calls are "
+             "always limited by BRAVE_RPS and OPENROUTER_RPS (default: no extra delay)"
+    )
+    
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Number of companies to process concurrently (default: 4)"
+    )
+    
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=10,
+        help="Number of companies whose revenue is extracted in one LLM call (default: 10)"
+    )
+    
+    parser.add_argument(
+        "--yes", "-y",
+        action="store_true",
+        help="Skip the confirmation prompt for large files"
+    )
+    
+    parser.add_argument(
+        "--verbose", "-v",
+        action="store_true",
+        help="Show per-request API logs instead of warnings only"
+    )
+    
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted run, skipping companies already in its JSONL output"
     )
     
     parser.add_argument(
@@ -81,6 +123,10 @@ Examples:
     
     args = parser.parse_args()
     
+    # Per-request INFO logs would drown out the progress bar; library modules don't
+    # configure logging, so this is the only place the root level is set
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    
     print("Company Revenue Analysis Automation")
     print("=" * 50)
     
@@ -96,18 +142,16 @@ Examples:
     
     print(f"✓ Input file found: {args.input_csv}")
     
+    # Imported here so --help and argument errors don't pay for the agent stack
+    from src.processors.csv_processor import CompanyRevenueProcessor
+    
     # Initialize processor
     processor = CompanyRevenueProcessor()
     
     try:
-        # Load and validate CSV
-        companies = processor.load_csv(args.input_csv)
-        print(f"✓ CSV loaded successfully with {len(companies)} companies")
-        
-        # Validate CSV structure
-        required_columns = ['Company Name', 'Company Region', 'Company Domain']
-        sample_company = companies[0] if companies else {}
-        missing_columns = [col for col in required_columns if col not in sample_company]
+        # Validate CSV structure from the header alone; rows are streamed later
+        header = processor.peek_header(args.input_csv)
+        missing_columns = [col for col in CompanyRevenueProcessor.REQUIRED_COLUMNS if col not in header]
         
         if missing_columns:
             print(f"✗ CSV missing required columns: {missing_columns}")
@@ -116,6 +160,14 @@ Examples:
         
         print("✓ CSV structure validated")
         
+        # Count rows without keeping them in memory
+        company_count = sum(1 for _ in processor.iter_rows(args.input_csv))
+        print(f"✓ CSV contains {company_count} companies")
+        
+        if company_count == 0:
+            print("✗ CSV has no company rows to process")
+            sys.exit(1)
+        
         if args.validate_only:
             print("\nValidation complete. Use without --validate-only to process companies.")
             return
@@ -127,13 +179,24 @@ Examples:
             output_path = input_path.parent / f"{input_path.stem}_analyzed"
         
         print(f"✓ Output will be saved with prefix: {output_path}")
-        print(f"✓ Delay between companies: {args.delay} seconds")
+        
+        csv_path = f"{output_path}.csv"
+        jsonl_path = f"{output_path}.jsonl"
+        
+        # Results already saved by an interrupted run are kept and not analyzed again
+        checkpoint = processor.load_checkpoint(jsonl_path) if args.resume else []
+        if checkpoint:
+            print(f"✓ Resuming: {len(checkpoint)} companies already analyzed")
+        if args.delay:
+            print(f"✓ Delay between batches: {args.delay} seconds")
+        print(f"✓ Concurrent workers: {args.workers}")
+        print(f"✓ Companies per LLM call: {args.batch_size}")
         
         # Confirm before processing
-        print(f"\nReady to process {len(companies)} companies.")
+        print(f"\nReady to process {company_count} companies.")
         print("This may take several minutes depending on the number of companies.")
         
-        if len(companies) > 5:
+        if company_count > 5 and not args.yes:
             response = input("Continue? (y/N): ")
             if response.lower() != 'y':
                 print("Processing cancelled.")
@@ -143,41 +206,63 @@ Examples:
         print(f"\nStarting processing at {time.strftime('%Y-%m-%d %H:%M:%S')}")
         start_time = time.time()
         
-        results = processor.process_companies_batch(companies, args.delay)
+        # Stream each result to disk as soon as its company finishes
+        total_companies = 0
+        revenue_found = 0
+        tier_counts = Counter()
+        
+        def record(result):
+            nonlocal total_companies, revenue_found
+            total_companies += 1
+            tier_counts[result.get('tier', 'Unknown')] += 1
+            revenue_found += result.get('estimated_revenue_usd') is not None
+        
+        # The JSONL file is the checkpoint; the CSV is rewritten from it on resume
+        with open(csv_path, 'w', newline='') as csv_file, \
+                open(jsonl_path, 'ab' if args.resume else 'wb') as jsonl_file, \
+                tqdm(total=company_count, initial=len(checkpoint), desc="companies", unit="co",
+                     mininterval=0.2) as progress, \
+                logging_redirect_tqdm():
+            writer = csv.DictWriter(
+                csv_file,
+                fieldnames=CompanyRevenueProcessor.RESULT_COLUMNS,
+                extrasaction="ignore"
+            )
+            writer.writeheader()
+            
+            for result in checkpoint:
+                writer.writerow(result)
+                record(result)
+            
+            rows = processor.skip_completed(processor.iter_rows(args.input_csv), checkpoint)
+            for _, result in processor.iter_process_companies(rows, args.delay, args.workers, args.batch_size):
+                writer.writerow(result)
+                jsonl_file.write(orjson.dumps(result) + b"\n")
+                
+                record(result)
+                progress.update()
         
         end_time = time.time()
         processing_time = end_time - start_time
         
-        # Save results
-        processor.save_results(results, str(output_path))
+        processor.write_summary(f"{output_path}_summary.txt", total_companies, revenue_found, tier_counts)
         
         # Print summary
         print(f"\nProcessing completed in {processing_time:.1f} seconds")
         print("=" * 50)
         
-        # Count results by tier
-        tier_counts = {}
-        revenue_found = 0
-        
-        for result in results:
-            tier = result.get('tier', 'Unknown')
-            tier_counts[tier] = tier_counts.get(tier, 0) + 1
-            
-            if result.get('estimated_revenue_usd') is not None:
-                revenue_found += 1
-        
-        print(f"Total Companies: {len(results)}")
+        print(f"Total Companies: {total_companies}")
         print(f"Revenue Data Found: {revenue_found}")
-        print(f"Success Rate: {(revenue_found/len(results))*100:.1f}%")
+        print(f"Success Rate: {(revenue_found/total_companies)*100 if total_companies else 0.0:.1f}%")
         
         print("\nTier Distribution:")
         for tier, count in sorted(tier_counts.items()):
-            percentage = (count/len(results))*100
+            percentage = (count/total_companies)*100 if total_companies else 0.0
             print(f"  {tier}: {count} ({percentage:.1f}%)")
         
         print(f"\nResults saved to:")
         print(f"  - {output_path}.csv")
-        print(f"  - {output_path}.json") 
+        print(f"  - {output_path}.jsonl")
         print(f"  - {output_path}_summary.txt")
         
     except KeyboardInterrupt:
@@ -135,7 +135,7 @@ Examples:
         print(f"Work emails generated: {successful_emails} ({successful_emails/total_contacts*100:.1f}%)")
         print(f"\nResults saved to:")
         print(f"  CSV: {args.output_file}")
-        print(f"  JSON: {args.output_file.replace('.csv', '.json')}")
+        print(f"  JSON: {output_path.with_suffix('.json')}")
         print(f"  Log: contact_enrichment.log")
         print(f"{'='*60}")
         
@@ -1,9 +1,93 @@
 #!/usr/bin/env python3
 """
 Simple example script to demonstrate the LangGraph agent.
+
+Questions typed or piped in quick succession are collected into a small batch
+and answered concurrently; a single question streams its answer as it arrives.
 """
 
-from src.agents.basic_agent import run_agent
+import asyncio
+import sys
+import threading
+
+from src.agents.basic_agent import arun_agent, run_agent_stream
+
+# Coalescing window for rapid-fire input
+MAX_BATCH_SIZE = 8
+BATCH_INTERVAL_SECONDS = 0.05
+
+QUIT_COMMANDS = ['quit', 'exit', 'q']
+
+
+def _start_reader(loop: asyncio.AbstractEventLoop, queue: asyncio.Queue):
+    """Read stdin on a daemon thread, forwarding lines to the queue (None on EOF or quit)."""
+    def read():
+        for line in sys.stdin:
+            line = line.strip()
+            if line.lower() in QUIT_COMMANDS:
+                break
+            if line:
+                loop.call_soon_threadsafe(queue.put_nowait, line)
+        loop.call_soon_threadsafe(queue.put_nowait, None)
+    
+    threading.Thread(target=read, daemon=True).start()
+
+
+async def _next_batch(queue: asyncio.Queue):
+    """Wait for a question, then collect any others arriving within the batch window."""
+    first = await queue.get()
+    if first is None:
+        return None
+    
+    batch = [first]
+    deadline = asyncio.get_running_loop().time() + BATCH_INTERVAL_SECONDS
+    
+    while len(batch) < MAX_BATCH_SIZE:
+        remaining = deadline - asyncio.get_running_loop().time()
+        if remaining <= 0:
+            break
+        try:
+            item = await asyncio.wait_for(queue.get(), remaining)
+        except asyncio.TimeoutError:
+            break
+        if item is None:
+            # Answer what we have, then stop on the next read
+            queue.put_nowait(None)
+            break
+        batch.append(item)
+    
+    return batch
+
+
+async def _print_stream(user_input: str):
+    """Print the agent's response token by token as it is generated."""
+    async for token in run_agent_stream(user_input):
+        print(token, end="", flush=True)
+    print()
+
+
+async def _chat():
+    queue: asyncio.Queue = asyncio.Queue()
+    _start_reader(asyncio.get_running_loop(), queue)
+    
+    while True:
+        print("\nYou: ", end="", flush=True)
+        batch = await _next_batch(queue)
+        
+        if batch is None:
+            print("Goodbye! 👋")
+            return
+        
+        if len(batch) == 1:
+            print("Agent: ", end="", flush=True)
+            await _print_stream(batch[0])
+            continue
+        
+        # Several questions arrived together: answer them concurrently, in input order
+        responses = await asyncio.gather(*[arun_agent(question) for question in batch])
+        for i, (question, response) in enumerate(zip(batch, responses), 1):
+            print(f"\n[{i}] You: {question}")
+            print(f"[{i}] Agent: {response}")
 
 
 def main():
@@ -18,26 +102,12 @@ def main():
     print("Enter your questions (type 'quit' to exit):")
     print("-" * 30)
     
-    while True:
-        try:
-            user_input = input("\nYou: ").strip()
-            
-            if user_input.lower() in ['quit', 'exit', 'q']:
-                print("Goodbye! 👋")
-                break
-            
-            if not user_input:
-                continue
-            
-            print("Agent: ", end="")
-            response = run_agent(user_input)
-            print(response)
-            
-        except KeyboardInterrupt:
-            print("\n\nGoodbye! 👋")
-            break
-        except Exception as e:
-            print(f"Error: {e}")
+    try:
+        asyncio.run(_chat())
+    except KeyboardInterrupt:
+        print("\n\nGoodbye! 👋")
+    except Exception as e:
+        print(f"Error: {e}")
 
 
 if __name__ == "__main__":
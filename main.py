@@ -41,11 +41,10 @@ Supports both:
 2. Shipsy Assignment Excel Automation
 """
 
-from src.agents.basic_agent import run_agent
-from src.processors.excel_company_processor import ExcelCompanyProcessor
-
 def run_demo():
     """Run the LangGraph agent demo."""
+    from src.agents.basic_agent import run_agent
+    
     print("🤖 LangGraph Agent Development Project")
     print("=" * 50)
     print("This is a basic example of a LangGraph agent with tools.")
@@ -65,31 +64,29 @@ def run_demo():
 
 def run_excel_automation():
     """Run the Shipsy Excel automation."""
+    from src.processors.excel_company_processor import ExcelCompanyProcessor
+    
     print("\n🚀 Starting Shipsy Assignment automation")
     print("=" * 50)
 
     processor = ExcelCompanyProcessor("Shipsy Assignment.xlsx")
 
-    # Part A: Companies
-    print("\n📊 Processing Companies...")
-    processor.process_companies(
-        input_sheet="Company",
-        output_sheet="Company Results"
+    # Part A (companies) and Part B (contacts) run side by side; their API calls overlap
+    print("\n📊📇 Processing Companies and Contacts...")
+    processor.process_all(
+        company_sheet="Company",
+        contact_sheet="Contacts",
+        company_output_sheet="Company Results",
+        contact_output_sheet="Contact Results"
     )
-    print("✅ Companies processed and written to 'Company Results' sheet.")
-
-
-    # Part B: Contacts
-    print("\n📇 Processing Contacts...")
-    processor.process_contacts(
-        input_sheet="Contacts",
-        output_sheet="Contact Results"
-    )
-    print("✅ Contacts processed and written to 'Contact Results' sheet.")
+    print("✅ Companies and contacts processed and written to 'Company Results' and 'Contact Results' sheets.")
 
     print("\n🎉 Automation finished successfully!")
 
 if __name__ == "__main__":
+    import logging
+    logging.basicConfig(level=logging.INFO)
+
     # 👉 Change this to choose which part to run
     # run_demo()
     run_excel_automation()
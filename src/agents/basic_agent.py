@@ -1,62 +1,104 @@
-from typing import Dict, Any, List
-from langchain_openai import ChatOpenAI
+import ast
+import operator
+import types
+from functools import lru_cache
+from typing import Annotated, Dict, Any, AsyncIterator, List, TypedDict
 from langchain_core.messages import HumanMessage, AIMessage
-from langgraph.graph import StateGraph, END
-from langgraph.graph.message import add_messages
-from langgraph.prebuilt import ToolNode
 from langchain_core.tools import tool
+from src.cache.llm_cache import get_response_cache
 from src.config.settings import Config
 
 
-class AgentState:
-    """State for the agent graph."""
-    messages: List[Any]
+# Arithmetic operators supported by the calculate tool
+_SAFE_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Pow: operator.pow,
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+}
 
 
+@lru_cache(maxsize=256)
+def _parse(expression: str) -> ast.Expression:
+    """Parse an arithmetic expression, reusing the AST for repeated expressions."""
+    return ast.parse(expression, mode="eval")
+
+
+def _eval(node: ast.AST):
+    """Evaluate a parsed arithmetic expression without compiling any code."""
+    if isinstance(node, ast.Expression):
+        return _eval(node.body)
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        return node.value
+    if isinstance(node, ast.BinOp) and type(node.op) in _SAFE_OPS:
+        return _SAFE_OPS[type(node.op)](_eval(node.left), _eval(node.right))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _SAFE_OPS:
+        return _SAFE_OPS[type(node.op)](_eval(node.operand))
+    raise ValueError("Unsupported expression")
+
+
+@tool
+def calculate(expression: str) -> str:
+    """Calculate a mathematical expression safely."""
+    try:
+        # Only numbers and arithmetic operators are evaluated
+        result = _eval(_parse(expression))
+        return f"The result of {expression} is {result}"
+    except Exception as e:
+        return f"Error calculating {expression}: {str(e)}"
+
+
+# Mock weather data served by get_weather - in a real scenario, you'd call a weather API
+_WEATHER = types.MappingProxyType({
+    "New York": "Sunny, 72°F",
+    "London": "Cloudy, 55°F",
+    "Tokyo": "Rainy, 68°F",
+    "Paris": "Partly cloudy, 65°F"
+})
+
+
+@tool
+def get_weather(city: str) -> str:
+    """Get weather information for a city (mock implementation)."""
+    return _WEATHER.get(city, f"Weather data not available for {city}")
+
+
+# Tools are defined once; their schemas never change
+_TOOLS = [calculate, get_weather]
+
+
+@lru_cache(maxsize=1)
 def create_agent_graph():
-    """Create a LangGraph agent with basic tools."""
+    """Create a LangGraph agent with basic tools.
+    
+    The graph has no inputs, so it is built once and reused by every run_agent call.
+    The OpenAI and LangGraph stacks are imported here so that importing this module
+    stays cheap until an agent is actually run.
+    """
+    from langchain_openai import ChatOpenAI
+    from langgraph.graph import StateGraph, END
+    from langgraph.graph.message import add_messages
+    from langgraph.prebuilt import ToolNode
+    
+    class AgentState(TypedDict):
+        """State for the agent graph."""
+        messages: Annotated[List[Any], add_messages]
     
     # Initialize the LLM
     llm = ChatOpenAI(
         model=Config.AGENT_MODEL,
         temperature=Config.AGENT_TEMPERATURE,
         max_tokens=Config.AGENT_MAX_TOKENS,
-        api_key=Config.OPENAI_API_KEY
+        api_key=Config.OPENAI_API_KEY,
+        cache=get_response_cache(Config.AGENT_TEMPERATURE)
     )
     
-    # Define tools
-    @tool
-    def calculate(expression: str) -> str:
-        """Calculate a mathematical expression safely."""
-        try:
-            # Simple evaluation for basic math operations
-            allowed_chars = set('0123456789+-*/().')
-            if all(c in allowed_chars or c.isspace() for c in expression):
-                result = eval(expression)
-                return f"The result of {expression} is {result}"
-            else:
-                return "Error: Invalid characters in expression"
-        except Exception as e:
-            return f"Error calculating {expression}: {str(e)}"
-    
-    @tool
-    def get_weather(city: str) -> str:
-        """Get weather information for a city (mock implementation)."""
-        # This is a mock implementation - in a real scenario, you'd call a weather API
-        weather_data = {
-            "New York": "Sunny, 72°F",
-            "London": "Cloudy, 55°F",
-            "Tokyo": "Rainy, 68°F",
-            "Paris": "Partly cloudy, 65°F"
-        }
-        return weather_data.get(city, f"Weather data not available for {city}")
-    
     # Bind tools to LLM
-    tools = [calculate, get_weather]
-    llm_with_tools = llm.bind_tools(tools)
-    
-    # Create tool node
-    tool_node = ToolNode(tools)
+    llm_with_tools = llm.bind_tools(_TOOLS)
     
     def call_model(state: AgentState) -> Dict[str, Any]:
         """Call the model with the current state."""
@@ -79,7 +121,7 @@ def create_agent_graph():
     
     # Add nodes
     workflow.add_node("agent", call_model)
-    workflow.add_node("tools", tool_node)
+    workflow.add_node("tools", ToolNode(_TOOLS))
     
     # Set entry point
     workflow.set_entry_point("agent")
@@ -106,9 +148,10 @@ def create_agent_graph():
 def run_agent(user_input: str) -> str:
     """Run the agent with user input and return the response."""
     try:
+        # Validation is remembered by Config, so repeated calls cost nothing
         Config.validate()
         
-        # Create the agent graph
+        # Get the (cached) agent graph
         agent = create_agent_graph()
         
         # Run the agent
@@ -124,6 +167,46 @@ def run_agent(user_input: str) -> str:
         return f"Error running agent: {str(e)}"
 
 
+async def arun_agent(user_input: str) -> str:
+    """Run the agent asynchronously so several questions can be answered concurrently."""
+    try:
+        Config.validate()
+        
+        agent = create_agent_graph()
+        
+        result = await agent.ainvoke({
+            "messages": [HumanMessage(content=user_input)]
+        })
+        
+        return result["messages"][-1].content
+        
+    except Exception as e:
+        return f"Error running agent: {str(e)}"
+
+
+async def run_agent_stream(user_input: str) -> AsyncIterator[str]:
+    """Run the agent with user input, yielding response tokens as they arrive."""
+    try:
+        Config.validate()
+        
+        agent = create_agent_graph()
+        
+        async for event in agent.astream_events(
+            {"messages": [HumanMessage(content=user_input)]},
+            version="v2"
+        ):
+            if event["event"] != "on_chat_model_stream":
+                continue
+            
+            # Tool call chunks carry no text, so only forward visible content
+            content = event["data"]["chunk"].content
+            if content:
+                yield content
+        
+    except Exception as e:
+        yield f"Error running agent: {str(e)}"
+
+
 if __name__ == "__main__":
     # Example usage
     print("LangGraph Agent Example")
@@ -1,19 +1,96 @@
 import logging
-import json
+import orjson
 import re
-from typing import Dict, List, Optional, Any
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
-from langchain_openai import ChatOpenAI
+from functools import cached_property, lru_cache
+from urllib.parse import urlparse
 from langchain_core.messages import HumanMessage, SystemMessage
+from pydantic import BaseModel
 from src.config.settings import Config
+from src.cache.llm_cache import get_response_cache
 from src.tools.web_search import BraveWebSearch
-import re
-from urllib.parse import urlparse
+from src.util.rate_limit import TokenBucketRateLimiter, get_openrouter_limiter
 
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Normalization for generated email addresses
+_EMAIL_CLEAN_RE = re.compile(r'[^a-z0-9.@\-]')
+_NAME_RE = re.compile(r'[^a-z0-9-]+')
+_WWW_RE = re.compile(r'^www\.')
+
+# Social media and job sites that are never a company's own website (matched on netloc)
+_SKIP_DOMAINS = frozenset({
+    "linkedin.com", "facebook.com", "twitter.com", "instagram.com",
+    "indeed.com", "glassdoor.com", "crunchbase.com"
+})
+
+
+def _is_skipped_netloc(netloc: str) -> bool:
+    """Return True if netloc is, or is a subdomain of, one of the skipped sites."""
+    labels = netloc.split(".")
+    return any(".".join(labels[i:]) in _SKIP_DOMAINS for i in range(len(labels) - 1))
+
+
+def _company_key(company_name: str) -> str:
+    """Normalise a company name so case and spacing variants share one domain lookup."""
+    return company_name.lower().strip()
+
+
+# Enough for {"linkedin_url": ..., "current_job_title": ...} with room to spare
+_CONTACT_REPLY_MAX_TOKENS = 256
+
+# Number of extract_contact_info results each agent remembers
+_CONTACT_CACHE_SIZE = 2048
+
+# Fallbacks for LLM replies that wrap the JSON object in prose or code fences
+_JSON_BLOCK_RE = re.compile(r'\{[^{}]*"linkedin_url".*?\}', re.DOTALL)
+_JSON_ARRAY_RE = re.compile(r'\[.*\]', re.DOTALL)
+_FIELD_RES = {
+    field: re.compile(rf'"{field}"\s*:\s*"([^"]+)"')
+    for field in ("linkedin_url", "current_job_title")
+}
+
+
+def _parse_contact_fields(text: str) -> Optional[Dict[str, str]]:
+    """
+    Parse linkedin_url and current_job_title from an LLM reply.
+    
+    Tries, in order: the whole reply as JSON, the first JSON object mentioning
+    linkedin_url, and finally each field on its own.
+    
+    Args:
+        text: Raw LLM response text
+        
+    Returns:
+        Dictionary with both fields (missing ones as NOT_FOUND), or None if unparseable
+    """
+    candidates = [text]
+    block = _JSON_BLOCK_RE.search(text)
+    if block:
+        candidates.append(block.group())
+    
+    for candidate in candidates:
+        try:
+            result = orjson.loads(candidate)
+        except orjson.JSONDecodeError:
+            continue
+        if isinstance(result, dict):
+            return {
+                "linkedin_url": result.get("linkedin_url", "NOT_FOUND"),
+                "current_job_title": result.get("current_job_title", "NOT_FOUND")
+            }
+    
+    fields = {field: pattern.search(text) for field, pattern in _FIELD_RES.items()}
+    if not any(fields.values()):
+        return None
+    return {field: match.group(1) if match else "NOT_FOUND" for field, match in fields.items()}
+
 
 @dataclass
 class ContactInfo:
@@ -26,23 +103,25 @@ class ContactInfo:
     citation_source: Optional[str] = None
 
 
+class LinkedInExtraction(BaseModel):
+    """Structured LLM output for a single contact."""
+    linkedin_url: str
+    current_job_title: str
+
+
 class ContactEnrichmentAgent:
     """Agent for enriching contact information using Brave Search and DeepSeek."""
     
     def __init__(self):
         """Initialize the contact enrichment agent."""
         self.brave_search = BraveWebSearch()
-        self.llm = ChatOpenAI(
-            model=Config.DEEPSEEK_MODEL,
-            api_key=Config.OPENROUTER_API_KEY,
-            base_url="https://openrouter.ai/api/v1",
-            temperature=Config.DEEPSEEK_TEMPERATURE,
-            max_tokens=Config.DEEPSEEK_MAX_TOKENS,
-            extra_headers={
-                "HTTP-Referer": "https://github.com/vaishnav/langgraph-agent-project",
-                "X-Title": "Contact Enrichment Agent"
-            }
-        )
+        
+        # Company domains resolved so far, keyed on normalized company name
+        self._domain_cache: Dict[str, str] = {}
+        
+        # Recent extract_contact_info results, least recently used first
+        self._contact_cache: "OrderedDict[Tuple[str, str], Dict[str, str]]" = OrderedDict()
+        self._contact_lock = threading.Lock()
         
         # System prompt for the agent
         self.system_prompt = """You are a professional contact enrichment specialist. Your task is to find LinkedIn profiles and current job titles for given contacts.
@@ -68,10 +147,74 @@ Return a JSON object with exactly these fields:
 }
 
 Do not include any other text or explanation."""
+        
+        # System prompt for extracting several contacts in one call
+        self.batch_system_prompt = """You are a professional contact enrichment specialist. Your task is to find LinkedIn profiles and current job titles for a numbered list of contacts.
+
+IMPORTANT INSTRUCTIONS:
+1. You will receive several contacts, each with a name, company name, and its own search results
+2. Use only that contact's search results to find their LinkedIn profile URL
+3. Extract their current job title at that company
+4. If you cannot find the information for a contact, return "NOT_FOUND" for both of its fields
+
+OUTPUT FORMAT:
+Return a JSON array with exactly one object per contact:
+[
+    {
+        "idx": <contact number>,
+        "linkedin_url": "https://linkedin.com/in/username" or "NOT_FOUND",
+        "current_job_title": "Job Title" or "NOT_FOUND"
+    }
+]
+
+Do not include any other text or explanation."""
+
+    @cached_property
+    def llm(self):
+        """
+        The DeepSeek chat model, built on first use.
+        
+        Callers that only need domains or work emails never pay for the OpenAI client.
+        """
+        import httpx
+        from langchain_openai import ChatOpenAI
+        
+        return ChatOpenAI(
+            model=Config.DEEPSEEK_MODEL,
+            api_key=Config.OPENROUTER_API_KEY,
+            base_url="https://openrouter.ai/api/v1",
+            temperature=Config.DEEPSEEK_TEMPERATURE,
+            max_tokens=Config.DEEPSEEK_MAX_TOKENS,
+            # Fail fast on unreachable hosts instead of the client's 10 minute default
+            timeout=httpx.Timeout(60.0, connect=5.0),
+            cache=get_response_cache(Config.DEEPSEEK_TEMPERATURE),
+            rate_limiter=TokenBucketRateLimiter(get_openrouter_limiter()),
+            extra_headers={
+                "HTTP-Referer": "https://github.com/vaishnav/langgraph-agent-project",
+                "X-Title": "Contact Enrichment Agent"
+            }
+        )
+
+    @cached_property
+    def structured_llm(self):
+        """
+        The chat model wrapped for single-contact JSON extraction, built on first use.
+        
+        JSON mode keeps replies parseable; raw output is kept for the text fallback.
+        The reply is two short fields, so generation is capped instead of allowing the
+        full DEEPSEEK_MAX_TOKENS for a runaway completion.
+        """
+        reply_llm = self.llm.model_copy(update={"max_tokens": _CONTACT_REPLY_MAX_TOKENS})
+        return reply_llm.with_structured_output(
+            LinkedInExtraction, method="json_mode", include_raw=True
+        )
 
-    def search_linkedin_profile(self, contact_name: str, company_name: str) -> Dict[str, Any]:
+    def search_contact(self, contact_name: str, company_name: str) -> Dict[str, Any]:
         """
-        Search for LinkedIn profile using Brave Search with site filters.
+        Search for the contact's LinkedIn profile and general profile pages in one query.
+        
+        Combines the LinkedIn and general profile queries so each contact costs a
+        single Brave round-trip; LinkedIn results are ordered first.
         
         Args:
             contact_name: Name of the contact
@@ -80,65 +223,65 @@ Do not include any other text or explanation."""
         Returns:
             Dictionary containing search results
         """
-        # Construct LinkedIn-specific search query
-        query_parts = [
-            "site:linkedin.com",
-            f'"{contact_name}"',
-            f'"{company_name}"'
-        ]
+        query = f'(site:linkedin.com/in OR profile OR bio) "{contact_name}" "{company_name}"'
+        logger.info(f"Searching contact profiles for: {query}")
         
-        query = " ".join(query_parts)
-        logger.info(f"Searching LinkedIn for: {query}")
-        
-        results = self.brave_search.search(query, count=10)
+        results = self.brave_search.search(query, count=15)
         
         if "error" in results:
-            logger.warning(f"LinkedIn search error: {results['error']}")
+            logger.warning(f"Contact search error: {results['error']}")
             return {"error": results["error"], "results": []}
         
         web_results = results.get("web", {}).get("results", [])
-        logger.info(f"Found {len(web_results)} LinkedIn search results")
         
-        return {"results": web_results}
+        # Partition client-side so LinkedIn profiles lead the prompt
+        linkedin = [r for r in web_results if "linkedin.com" in r.get("url", "").lower()]
+        others = [r for r in web_results if "linkedin.com" not in r.get("url", "").lower()]
+        logger.info(f"Found {len(linkedin)} LinkedIn and {len(others)} additional search results")
+        
+        return {"results": linkedin + others}
 
-    def search_additional_info(self, contact_name: str, company_name: str) -> Dict[str, Any]:
+    @staticmethod
+    def _format_search_results(results: List[Dict[str, Any]], contact_name: str) -> str:
         """
-        Search for additional information about the contact.
+        Format the top 10 search results for an LLM prompt as a compact JSON array.
         
-        Args:
-            contact_name: Name of the contact
-            company_name: Name of the company
-            
-        Returns:
-            Dictionary containing search results
+        Duplicate URLs are dropped, results that never mention the contact's name are
+        skipped when any others do, and descriptions are truncated to 120 characters.
         """
-        # Search for general information about the person
-        query_parts = [
-            f'"{contact_name}"',
-            f'"{company_name}"',
-            "profile",
-            "bio",
-            "about"
-        ]
+        name_tokens = [token for token in contact_name.lower().split() if len(token) > 1]
         
-        query = " ".join(query_parts)
-        logger.info(f"Searching additional info for: {query}")
-        
-        results = self.brave_search.search(query, count=10)
-        
-        if "error" in results:
-            logger.warning(f"Additional search error: {results['error']}")
-            return {"error": results["error"], "results": []}
+        seen = set()
+        unique_results = []
+        for result in results:
+            url = result.get("url", "")
+            if url in seen:
+                continue
+            seen.add(url)
+            unique_results.append(result)
         
-        web_results = results.get("web", {}).get("results", [])
-        logger.info(f"Found {len(web_results)} additional search results")
+        relevant = [
+            result for result in unique_results
+            if any(token in f"{result.get('title', '')} {result.get('url', '')}".lower() for token in name_tokens)
+        ]
         
-        return {"results": web_results}
+        # Compact JSON is built in one call and costs fewer tokens than labelled lines
+        return orjson.dumps([
+            {
+                "title": result.get("title", ""),
+                "url": result.get("url", ""),
+                "description": result.get("description", "")[:120]
+            }
+            for result in (relevant or unique_results)[:10]
+        ]).decode()
 
     def extract_contact_info(self, contact_name: str, company_name: str) -> Dict[str, str]:
         """
         Extract LinkedIn URL and job title using the LLM.
         
+        Results are remembered per contact (ignoring case and surrounding spaces), so
+        duplicate rows and retries skip the search and LLM call; failures are not.
+        
         Args:
             contact_name: Name of the contact
             company_name: Name of the company
@@ -147,41 +290,68 @@ Do not include any other text or explanation."""
             Dictionary with linkedin_url and current_job_title
         """
         try:
-            # Get LinkedIn search results
-            linkedin_results = self.search_linkedin_profile(contact_name, company_name)
-            
-            # Get additional search results
-            additional_results = self.search_additional_info(contact_name, company_name)
-            
-            # Combine all search results
-            all_results = []
-            
-            if "results" in linkedin_results:
-                all_results.extend(linkedin_results["results"])
-            
-            if "results" in additional_results:
-                all_results.extend(additional_results["results"])
-            
-            if not all_results:
-                logger.warning(f"No search results found for {contact_name} at {company_name}")
-                return {
-                    "linkedin_url": "NOT_FOUND",
-                    "current_job_title": "NOT_FOUND"
-                }
-            
-            # Format search results for the LLM
-            formatted_results = []
-            for i, result in enumerate(all_results[:10], 1):  # Limit to top 10 results
-                formatted_results.append(
-                    f"{i}. {result.get('title', 'No title')}\n"
-                    f"   URL: {result.get('url', 'No URL')}\n"
-                    f"   Description: {result.get('description', 'No description')}\n"
-                )
-            
-            search_results_text = "\n".join(formatted_results)
-            
-            # Create the prompt for the LLM
-            human_prompt = f"""Contact Name: {contact_name}
+            return self._lookup_contact_info(contact_name, company_name)
+        except Exception as e:
+            logger.error(f"Error extracting contact info for {contact_name}: {str(e)}")
+            return {
+                "linkedin_url": "NOT_FOUND",
+                "current_job_title": "NOT_FOUND"
+            }
+
+    def _lookup_contact_info(self, contact_name: str, company_name: str) -> Dict[str, str]:
+        """Memoized _extract_contact_info; search and LLM failures are raised, not remembered."""
+        key = self._contact_key(contact_name, company_name)
+        cached = self._cached_contact(key)
+        if cached is not None:
+            return cached
+        
+        result = self._extract_contact_info(contact_name, company_name)
+        self._remember_contact(key, result)
+        return dict(result)
+
+    @staticmethod
+    def _contact_key(contact_name: str, company_name: str) -> Tuple[str, str]:
+        """Memo key for a contact, ignoring case and surrounding spaces."""
+        return contact_name.lower().strip(), _company_key(company_name)
+
+    def _cached_contact(self, key: Tuple[str, str]) -> Optional[Dict[str, str]]:
+        """Return a copy of the remembered extraction for key, or None."""
+        with self._contact_lock:
+            cached = self._contact_cache.get(key)
+            if cached is None:
+                return None
+            self._contact_cache.move_to_end(key)
+            return dict(cached)
+
+    def _remember_contact(self, key: Tuple[str, str], result: Dict[str, str]) -> None:
+        """Remember an extraction, evicting the least recently used beyond the cache size."""
+        with self._contact_lock:
+            self._contact_cache[key] = dict(result)
+            self._contact_cache.move_to_end(key)
+            if len(self._contact_cache) > _CONTACT_CACHE_SIZE:
+                self._contact_cache.popitem(last=False)
+
+    def _extract_contact_info(self, contact_name: str, company_name: str) -> Dict[str, str]:
+        """Search for the contact and extract their details with the LLM, without memoization."""
+        # Get LinkedIn and additional search results with one query
+        search = self.search_contact(contact_name, company_name)
+        if "error" in search:
+            # Raised rather than returned so a transient failure is not memoized
+            raise RuntimeError(f"Search failed: {search['error']}")
+        all_results = search.get("results", [])
+        
+        if not all_results:
+            logger.warning(f"No search results found for {contact_name} at {company_name}")
+            return {
+                "linkedin_url": "NOT_FOUND",
+                "current_job_title": "NOT_FOUND"
+            }
+        
+        # Format search results for the LLM
+        search_results_text = self._format_search_results(all_results, contact_name)
+        
+        # Create the prompt for the LLM
+        human_prompt = f"""Contact Name: {contact_name}
 Company Name: {company_name}
 
 Search Results:
@@ -189,119 +359,170 @@ Search Results:
 
 Please find the LinkedIn profile URL and current job title for this person."""
 
-            # Call the LLM
+        # Call the LLM
+        messages = [
+            SystemMessage(content=self.system_prompt),
+            HumanMessage(content=human_prompt)
+        ]
+        
+        logger.info(f"Calling LLM for contact: {contact_name} at {company_name}")
+        response = self.structured_llm.invoke(messages)
+        
+        parsed = response["parsed"]
+        if parsed is not None:
+            return parsed.model_dump()
+        
+        # Parse the raw response
+        response_text = response["raw"].content.strip()
+        logger.info(f"LLM response: {response_text}")
+        
+        # Parse the JSON response, recovering it from surrounding prose if needed
+        result = _parse_contact_fields(response_text)
+        if result is None:
+            logger.error(f"Failed to parse LLM response as JSON: {response_text}")
+            return {
+                "linkedin_url": "NOT_FOUND",
+                "current_job_title": "NOT_FOUND"
+            }
+        return result
+
+    def extract_contact_info_batch(
+        self, contacts: List[Tuple[str, str, List[Dict[str, Any]]]]
+    ) -> List[Dict[str, str]]:
+        """
+        Extract LinkedIn URLs and job titles for several contacts with one LLM call.
+        
+        Contacts missing from the batched reply (or all of them, if it cannot be
+        parsed) fall back to one extract_contact_info call each. Extractions are
+        remembered like those of extract_contact_info.
+        
+        Args:
+            contacts: List of (contact_name, company_name, search_results) tuples
+            
+        Returns:
+            List of dictionaries with linkedin_url and current_job_title, one per contact
+        """
+        not_found = {"linkedin_url": "NOT_FOUND", "current_job_title": "NOT_FOUND"}
+        results: List[Optional[Dict[str, str]]] = [None] * len(contacts)
+        
+        sections = []
+        for idx, (contact_name, company_name, search_results) in enumerate(contacts, 1):
+            if not search_results:
+                logger.warning(f"No search results found for {contact_name} at {company_name}")
+                results[idx - 1] = dict(not_found)
+                self._remember_contact(self._contact_key(contact_name, company_name), not_found)
+                continue
+            
+            sections.append(
+                f"### Contact {idx}\n"
+                f"Contact Name: {contact_name}\n"
+                f"Company Name: {company_name}\n\n"
+                f"Search Results:\n{self._format_search_results(search_results, contact_name)}"
+            )
+        
+        if sections:
+            human_prompt = "\n\n".join(sections) + (
+                "\n\nPlease find the LinkedIn profile URL and current job title for each contact."
+            )
             messages = [
-                SystemMessage(content=self.system_prompt),
+                SystemMessage(content=self.batch_system_prompt),
                 HumanMessage(content=human_prompt)
             ]
             
-            logger.info(f"Calling LLM for contact: {contact_name} at {company_name}")
-            response = self.llm.invoke(messages)
-            
-            # Parse the response
-            response_text = response.content.strip()
-            logger.info(f"LLM response: {response_text}")
-            
-            # Try to parse JSON response
             try:
-                result = json.loads(response_text)
-                return {
-                    "linkedin_url": result.get("linkedin_url", "NOT_FOUND"),
-                    "current_job_title": result.get("current_job_title", "NOT_FOUND")
-                }
-            except json.JSONDecodeError:
-                logger.error(f"Failed to parse LLM response as JSON: {response_text}")
-                return {
-                    "linkedin_url": "NOT_FOUND",
-                    "current_job_title": "NOT_FOUND"
-                }
+                logger.info(f"Calling LLM for a batch of {len(sections)} contacts")
+                response_text = self.llm.invoke(messages).content.strip()
                 
-        except Exception as e:
-            logger.error(f"Error extracting contact info for {contact_name}: {str(e)}")
-            return {
-                "linkedin_url": "NOT_FOUND",
-                "current_job_title": "NOT_FOUND"
-            }
+                for entry in self._parse_contact_batch(response_text):
+                    idx = entry.get("idx")
+                    if isinstance(idx, int) and 1 <= idx <= len(contacts) and results[idx - 1] is None:
+                        results[idx - 1] = {
+                            "linkedin_url": entry.get("linkedin_url", "NOT_FOUND"),
+                            "current_job_title": entry.get("current_job_title", "NOT_FOUND")
+                        }
+                        self._remember_contact(self._contact_key(*contacts[idx - 1][:2]), results[idx - 1])
+            except Exception as e:
+                logger.error(f"Batched contact extraction failed: {str(e)}")
+        
+        for i, (contact_name, company_name, _) in enumerate(contacts):
+            if results[i] is None:
+                # Fall back to a single-contact call for anything the batch reply missed
+                logger.warning(f"Batched response missing {contact_name}, retrying individually")
+                results[i] = self.extract_contact_info(contact_name, company_name)
+        
+        return results
+
+    @staticmethod
+    def _parse_contact_batch(text: str) -> List[Dict[str, Any]]:
+        """Parse the JSON array of a batched reply, tolerating surrounding prose."""
+        candidates = [text]
+        block = _JSON_ARRAY_RE.search(text)
+        if block:
+            candidates.append(block.group())
+        
+        for candidate in candidates:
+            try:
+                parsed = orjson.loads(candidate)
+            except orjson.JSONDecodeError:
+                continue
+            if isinstance(parsed, dict):
+                # Some models wrap the array in an object
+                parsed = next((v for v in parsed.values() if isinstance(v, list)), [])
+            if isinstance(parsed, list):
+                return [entry for entry in parsed if isinstance(entry, dict)]
+        
+        logger.error(f"Failed to parse batched LLM response as JSON: {text}")
+        return []
 
     def generate_work_email(self, contact_name: str, company_domain: str) -> str:
         """
         Generate a likely work email address from contact name and company domain.
         
+        Uses the firstname.lastname@domain format, or firstname@domain for single names.
+        
         Args:
             contact_name: Full name of the contact
-            company_domain: Company domain (e.g., "company.com")
+            company_domain: Company domain (e.g., "company.com") or website URL
             
         Returns:
             Generated email address
- 
+        """
         if not contact_name or not company_domain:
             return "NOT_FOUND"
         
-        # Clean the domain
-        domain = company_domain.lower().strip()
-        if not domain.startswith('@'):
-            domain = f"@{domain}"
-        
-        # Parse the name
-        name_parts = contact_name.lower().strip().split()
-        
-        if len(name_parts) >= 2:
-            # Try firstname.lastname@domain format
-            first_name = name_parts[0]
-            last_name = name_parts[-1]
-            email = f"{first_name}.{last_name}{domain}"
-        elif len(name_parts) == 1:
-            # Single name - use firstname@domain
-            email = f"{name_parts[0]}{domain}"
-        else:
+        domain = _WWW_RE.sub('', (urlparse(company_domain).netloc or company_domain).strip().lower())
+        domain = _EMAIL_CLEAN_RE.sub('', domain)
+        parts = [cleaned for part in contact_name.lower().split() if (cleaned := _NAME_RE.sub('', part))]
+        if not domain or not parts:
             return "NOT_FOUND"
         
-        # Clean up the email
-        email = re.sub(r'[^a-zA-Z0-9.@]', '', email)
-        
-        logger.info(f"Generated email for {contact_name}: {email}")
-        return email
-        """
-        if not contact_name or not company_domain:
-            return "NOT_FOUND"
-
-    # Clean the domain
-        if company_domain.startswith("http"):
-            parsed = urlparse(company_domain)
-            domain = parsed.netloc
-        else:
-            domain = company_domain
-        if domain.startswith("www."):
-            domain = domain[4:]
-        domain = domain.lower().strip()
-        if not domain:
-            return "NOT_FOUND"
-
-     # Parse the name
-        name_parts = contact_name.lower().strip().split()
-        if len(name_parts) >= 2:
-            first_name = name_parts[0]
-            last_name = name_parts[-1]
-            email = f"{first_name}.{last_name}@{domain}"
-        elif len(name_parts) == 1:
-            email = f"{name_parts[0]}@{domain}"
-        else:
-            return "NOT_FOUND"
-
-        # Clean up the email safely
-        email = re.sub(r'[^a-z0-9.@\-]', '', email)
-        return email
+        local = parts[0] if len(parts) == 1 else f"{parts[0]}.{parts[-1]}"
+        return f"{local}@{domain}"
 
     def extract_company_domain(self, company_name: str) -> Optional[str]:
         """
         Extract company domain from company name using web search.
         
+        Domains found are remembered for the lifetime of the agent, so contacts at the
+        same company only search once; misses are retried on the next call.
+        
         Args:
             company_name: Name of the company
             
         Returns:
             Company domain or None if not found
         """
+        key = _company_key(company_name)
+        if key in self._domain_cache:
+            return self._domain_cache[key]
+        
+        domain = self._search_company_domain(company_name)
+        if domain:
+            self._domain_cache[key] = domain
+        return domain
+
+    def _search_company_domain(self, company_name: str) -> Optional[str]:
+        """Search the web for the company's own website and return its domain."""
         try:
             # Search for company website
             query = f'"{company_name}" official website'
@@ -316,25 +537,15 @@ Please find the LinkedIn profile URL and current job title for this person."""
             # Look for company website in results
             for result in web_results:
                 url = result.get("url", "").lower()
-                title = result.get("title", "").lower()
-                
-                # Skip LinkedIn, social media, and job sites
-                skip_domains = ["linkedin.com", "facebook.com", "twitter.com", "instagram.com", 
-                              "indeed.com", "glassdoor.com", "crunchbase.com"]
-                
-                if any(skip_domain in url for skip_domain in skip_domains):
-                    continue
                 
                 # Extract domain from URL
                 if url.startswith("http"):
                     try:
-                        from urllib.parse import urlparse
-                        parsed_url = urlparse(url)
-                        domain = parsed_url.netloc
+                        domain = urlparse(url).netloc.removeprefix("www.")
                         
-                        # Remove www prefix
-                        if domain.startswith("www."):
-                            domain = domain[4:]
+                        # Skip LinkedIn, social media, and job sites
+                        if _is_skipped_netloc(domain):
+                            continue
                         
                         if domain and "." in domain:
                             logger.info(f"Found domain for {company_name}: {domain}")
@@ -363,14 +574,22 @@ Please find the LinkedIn profile URL and current job title for this person."""
         """
         logger.info(f"Starting enrichment for: {contact_name} at {company_name}")
         
-        # Initialize contact info
+        # The LinkedIn extraction and the domain lookup are independent, so overlap them
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            domain_future = executor.submit(self.extract_company_domain, company_name)
+            agent_results = self.extract_contact_info(contact_name, company_name)
+            company_domain = domain_future.result()
+        
+        return self._build_contact_info(contact_name, company_name, agent_results, company_domain)
+
+    def _build_contact_info(self, contact_name: str, company_name: str, agent_results: Dict[str, str],
+                            company_domain: Optional[str]) -> ContactInfo:
+        """Combine extracted LinkedIn details with a work email at the company's domain."""
         contact_info = ContactInfo(
             contact_name=contact_name,
             company_name=company_name
         )
         
-        # Extract LinkedIn URL and job title using the agent
-        agent_results = self.extract_contact_info(contact_name, company_name)
         contact_info.linkedin_url = agent_results["linkedin_url"]
         contact_info.current_job_title = agent_results["current_job_title"]
         
@@ -380,8 +599,7 @@ Please find the LinkedIn profile URL and current job title for this person."""
         else:
             contact_info.citation_source = "Web Search"
         
-        # Extract company domain and generate work email
-        company_domain = self.extract_company_domain(company_name)
+        # Generate work email from the company domain
         if company_domain:
             contact_info.work_email = self.generate_work_email(contact_name, company_domain)
         else:
@@ -390,17 +608,94 @@ Please find the LinkedIn profile URL and current job title for this person."""
         logger.info(f"Enrichment completed for: {contact_name}")
         return contact_info
 
-    def process_contacts_batch(self, contacts: List[Dict[str, str]]) -> List[ContactInfo]:
+    def _enrich_or_fail(self, contact_name: str, company_name: str, domain_future: Future) -> ContactInfo:
+        """Enrich a contact, returning a placeholder marked ERROR if enrichment fails."""
+        try:
+            agent_results = self._lookup_contact_info(contact_name, company_name)
+            return self._build_contact_info(contact_name, company_name, agent_results, domain_future.result())
+        except Exception as e:
+            logger.error(f"Error processing contact {contact_name}: {str(e)}")
+            # Add a failed contact with basic info
+            return ContactInfo(
+                contact_name=contact_name,
+                company_name=company_name,
+                linkedin_url="ERROR",
+                current_job_title="ERROR",
+                work_email="ERROR",
+                citation_source="ERROR"
+            )
+
+    def _enrich_chunk(self, chunk: List[Tuple[str, str]], domain_futures: Dict[str, Future]) -> List[ContactInfo]:
+        """
+        Enrich several contacts, extracting their LinkedIn details with one LLM call.
+        
+        Contacts already extracted are served from the memo, and a contact listed
+        more than once in the chunk is searched and extracted once. Contacts whose
+        search fails are retried on their own through _enrich_or_fail, so a failure
+        is reported as ERROR rather than as NOT_FOUND.
+        """
+        try:
+            keys = [self._contact_key(*contact) for contact in chunk]
+            extracted: Dict[Tuple[str, str], Dict[str, str]] = {}
+            pending: Dict[Tuple[str, str], Tuple[str, str]] = {}
+            for key, contact in zip(keys, chunk):
+                if key in extracted or key in pending:
+                    continue
+                cached = self._cached_contact(key)
+                if cached is not None:
+                    extracted[key] = cached
+                else:
+                    pending[key] = contact
+            
+            if pending:
+                with ThreadPoolExecutor(max_workers=4) as executor:
+                    searches = list(executor.map(lambda c: self.search_contact(*c), pending.values()))
+                
+                searched = []
+                for key, (name, company), search in zip(pending, pending.values(), searches):
+                    if "error" in search:
+                        logger.warning(f"Contact search failed for {name}: {search['error']}")
+                    else:
+                        searched.append((key, name, company, search.get("results", [])))
+                
+                batch_results = self.extract_contact_info_batch(
+                    [(name, company, results) for _, name, company, results in searched]
+                )
+                extracted.update(zip((key for key, *_ in searched), batch_results))
+            
+            return [
+                self._build_contact_info(name, company, extracted[key],
+                                         domain_futures[_company_key(company)].result())
+                if key in extracted else
+                self._enrich_or_fail(name, company, domain_futures[_company_key(company)])
+                for key, (name, company) in zip(keys, chunk)
+            ]
+        except Exception as e:
+            logger.error(f"Error processing batch of {len(chunk)} contacts: {str(e)}")
+            return [self._enrich_or_fail(name, company, domain_futures[_company_key(company)])
+                    for name, company in chunk]
+
+    def process_contacts_batch(self, contacts: List[Dict[str, str]], max_workers: int = 10,
+                               batch_size: int = 8) -> List[ContactInfo]:
         """
         Process a batch of contacts for enrichment.
         
+        Contacts are grouped into chunks of batch_size whose LinkedIn details are
+        extracted with a single LLM call, and chunks are enriched concurrently since
+        each is bound on search and LLM round-trips; Brave Search calls stay within
+        the shared rate limit. Each company's domain is looked up once up front and
+        shared by all of its contacts, alongside the contact searches. A contact
+        listed more than once is searched and extracted once.
+        
         Args:
             contacts: List of dictionaries with 'contact_name' and 'company_name' keys
+            max_workers: Maximum number of chunks enriched at once
+            batch_size: Number of contacts per LLM call (1 disables batching)
             
         Returns:
-            List of ContactInfo objects
+            List of ContactInfo objects, in input order
         """
-        enriched_contacts = []
+        valid_contacts = []
         
         for i, contact in enumerate(contacts, 1):
             contact_name = contact.get("contact_name", "")
@@ -410,37 +705,54 @@ Please find the LinkedIn profile URL and current job title for this person."""
                 logger.warning(f"Skipping contact {i}: missing name or company")
                 continue
             
-            logger.info(f"Processing contact {i}/{len(contacts)}: {contact_name}")
-            
-            try:
-                enriched_contact = self.enrich_contact(contact_name, company_name)
-                enriched_contacts.append(enriched_contact)
-                
-                # Add a small delay to avoid rate limiting
-                import time
-                time.sleep(2)
-                
-            except Exception as e:
-                logger.error(f"Error processing contact {contact_name}: {str(e)}")
-                # Add a failed contact with basic info
-                failed_contact = ContactInfo(
-                    contact_name=contact_name,
-                    company_name=company_name,
-                    linkedin_url="ERROR",
-                    current_job_title="ERROR",
-                    work_email="ERROR",
-                    citation_source="ERROR"
-                )
-                enriched_contacts.append(failed_contact)
+            valid_contacts.append((contact_name, company_name))
         
-        return enriched_contacts
-    
+        logger.info(f"Processing {len(valid_contacts)} contacts with up to {max_workers} workers")
+        
+        # One lookup per distinct company, however many of its contacts are listed
+        companies = {_company_key(company): company for _, company in valid_contacts}
+        
+        with ThreadPoolExecutor(max_workers=4) as domain_executor, \
+                ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            domain_futures = {key: domain_executor.submit(self.extract_company_domain, company)
+                              for key, company in companies.items()}
+            
+            if batch_size <= 1:
+                return list(executor.map(
+                    lambda c: self._enrich_or_fail(*c, domain_futures[_company_key(c[1])]), valid_contacts
+                ))
+            
+            # Repeats of a contact share its chunk so they are searched and extracted once;
+            # batch_size counts distinct contacts, which is what each LLM call sees
+            rows_by_key: Dict[Tuple[str, str], List[int]] = {}
+            for i, contact in enumerate(valid_contacts):
+                rows_by_key.setdefault(self._contact_key(*contact), []).append(i)
+            groups = list(rows_by_key.values())
+            chunk_rows = [[i for rows in groups[j:j + batch_size] for i in rows]
+                          for j in range(0, len(groups), batch_size)]
+            
+            results: List[Optional[ContactInfo]] = [None] * len(valid_contacts)
+            enriched_chunks = executor.map(
+                lambda rows: self._enrich_chunk([valid_contacts[i] for i in rows], domain_futures), chunk_rows
+            )
+            for rows, enriched in zip(chunk_rows, enriched_chunks):
+                for i, info in zip(rows, enriched):
+                    results[i] = info
+            return results
+
+
+@lru_cache(maxsize=1)
+def _get_agent() -> ContactEnrichmentAgent:
+    """Return the process-wide agent so its HTTP clients and caches are reused."""
+    return ContactEnrichmentAgent()
+
+
 def run_contact_agent(contact_name: str, company_name: str, company_domain: str = ""):
     """
     Wrapper function to be used in excel_company_processor.
-    Uses ContactEnrichmentAgent to enrich contact details.
+    Uses a shared ContactEnrichmentAgent to enrich contact details.
     """
-    agent = ContactEnrichmentAgent()
+    agent = _get_agent()
     result = agent.enrich_contact(contact_name, company_name)
     
     return (
@@ -451,6 +763,30 @@ def run_contact_agent(contact_name: str, company_name: str, company_domain: str
     )
 
 
+def run_contact_agent_batch(contacts: List[Tuple[str, str]], max_workers: int = 10):
+    """
+    Batch counterpart of run_contact_agent for excel_company_processor.
+    LinkedIn details are extracted for several contacts per LLM call via
+    process_contacts_batch. Contacts missing a name or company get a tuple of
+    Nones so the results stay aligned with the input.
+    """
+    valid = [i for i, (contact_name, company_name) in enumerate(contacts) if contact_name and company_name]
+    enriched = _get_agent().process_contacts_batch(
+        [{"contact_name": contacts[i][0], "company_name": contacts[i][1]} for i in valid],
+        max_workers=max_workers
+    )
+    
+    results = [(None, None, None, None)] * len(contacts)
+    for i, result in zip(valid, enriched):
+        results[i] = (
+            result.linkedin_url,
+            result.current_job_title,
+            result.work_email,
+            result.citation_source
+        )
+    return results
+
+
 
 if __name__ == "__main__":
     # Test the contact enrichment agent
@@ -1,18 +1,198 @@
 import requests
-import json
+import orjson
 import logging
+import math
+import random
 import time
-import re
+import string
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple
 from langchain_core.messages import HumanMessage, AIMessage
+from langchain_core.outputs import Generation
 from langchain_core.tools import tool
 from src.config.settings import Config
+from src.util.http import create_session
+from src.util.rate_limit import get_openrouter_limiter, get_openrouter_token_limiter
+from src.cache.llm_cache import get_response_cache
 from src.tools.web_search import BraveWebSearch
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging; handlers and levels are left to the entry point
 logger = logging.getLogger(__name__)
 
+# Shared across all calls so TCP/TLS connections are reused. _retry_api_call already
+# retries with backoff, so transport retries would multiply the attempts per call.
+_session = create_session(retries=0)
+
+# Number of completed analyses each agent remembers
+_ANALYSIS_CACHE_SIZE = 4096
+
+# Guidance shared by the single-company and batched extraction prompts
+_EXTRACTION_NOTES = """Important notes:
+- Prefer official financial reports, SEC filings, or investor relations pages
+- Use the most recent data available
+- If multiple sources conflict, choose the most authoritative one
+- Convert currencies using approximate exchange rates if needed
+- Use estimates from relevant sources if needed"""
+
+# System prompts hold no per-company text, so every request shares the same prefix
+# and the provider's prompt cache can reuse it; company data goes in the user message
+_SINGLE_SYSTEM_PROMPT = f"""You are a financial analyst tasked with extracting the most recent annual revenue for a company.
+
+Based on the search results provided, please:
+1. Find the most recent annual operating revenue. If not available, use an estimate.
+2. Convert it to USD if it's in another currency
+3. Provide the specific source URL where you found this information
+4. If you cannot find reliable revenue from data, state that clearly
+
+Please respond in the following JSON format:
+{{
+    "revenue_usd": <number in USD or null if not found>,
+    "source_url": "<URL of the source or empty string if not found>",
+    "confidence": "<high/medium/low>",
+    "reasoning": "<brief explanation of how you arrived at this conclusion>"
+}}
+
+{_EXTRACTION_NOTES}"""
+
+_BATCH_SYSTEM_PROMPT = f"""You are a financial analyst tasked with extracting the most recent annual revenue for each company in a numbered list.
+
+For each company, based on its search results, please:
+1. Find the most recent annual operating revenue. If not available, use an estimate.
+2. Convert it to USD if it's in another currency
+3. Provide the specific source URL where you found this information
+4. If you cannot find reliable revenue from data, state that clearly
+
+Please respond with a JSON object in the following format, with one entry per company:
+{{
+    "results": [
+        {{
+            "index": <company number from the list>,
+            "revenue_usd": <number in USD or null if not found>,
+            "source_url": "<URL of the source or empty string if not found>",
+            "confidence": "<high/medium/low>",
+            "reasoning": "<brief explanation of how you arrived at this conclusion>"
+        }}
+    ]
+}}
+
+{_EXTRACTION_NOTES}"""
+
+
+_DOMAIN_CHARS = frozenset(string.ascii_letters + string.digits + ".-")
+
+
+def _looks_like_domain(domain: str) -> bool:
+    """Loose check for a bare domain such as "example.com", linear in its length."""
+    name, dot, tld = domain.rpartition(".")
+    return (
+        bool(dot and name)
+        and len(domain) < 254
+        and len(tld) >= 2
+        and tld.isascii()
+        and tld.isalpha()
+        and all(c in _DOMAIN_CHARS for c in name)
+    )
+
+
+class _JsonObjectScanner:
+    """
+    Find the first balanced {...} object in text that may arrive in pieces.
+    
+    Tracks brace depth and skips braces inside JSON strings, so prose before or
+    after the object (or a second object) is never captured. Each character is
+    scanned once however the text is split.
+    """
+    
+    def __init__(self):
+        self._text = ""
+        self._depth = 0
+        self._start = -1
+        self._in_string = False
+        self._escaped = False
+    
+    def feed(self, chunk: str) -> Optional[str]:
+        """Add more text, returning the object once its closing brace has arrived."""
+        offset = len(self._text)
+        self._text += chunk
+        
+        for i, char in enumerate(chunk, offset):
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == "{":
+                if self._depth == 0:
+                    self._start = i
+                self._depth += 1
+            elif char == "}" and self._depth:
+                self._depth -= 1
+                if self._depth == 0:
+                    return self._text[self._start:i + 1]
+            elif char == '"' and self._depth:
+                self._in_string = True
+        
+        return None
+
+
+def _extract_json_object(text: str) -> Optional[str]:
+    """Return the first balanced {...} object in text, or None if there is none."""
+    return _JsonObjectScanner().feed(text)
+
+
+def _read_streamed_content(response: requests.Response) -> str:
+    """
+    Accumulate the content of a streamed chat completion.
+    
+    The stream is closed as soon as the first JSON object in the content is
+    complete, so any trailing prose is never generated or downloaded.
+    """
+    scanner = _JsonObjectScanner()
+    parts = []
+    saw_choices = False
+    
+    try:
+        for line in response.iter_lines():
+            # Blank keep-alives and ": OPENROUTER PROCESSING" comments carry no data
+            if not line.startswith(b"data: "):
+                continue
+            data = line[len(b"data: "):]
+            if data == b"[DONE]":
+                break
+            
+            chunk = orjson.loads(data)
+            if "error" in chunk:
+                raise APIError(f"Streaming error from OpenRouter API: {chunk['error']}")
+            if not chunk.get("choices"):
+                continue
+            
+            saw_choices = True
+            delta = chunk["choices"][0].get("delta", {}).get("content") or ""
+            parts.append(delta)
+            if scanner.feed(delta) is not None:
+                logger.info("JSON object complete, closing DeepSeek stream early")
+                break
+    finally:
+        response.close()
+    
+    if not saw_choices:
+        raise DataProcessingError("Invalid API response: missing 'choices' field")
+    return "".join(parts)
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Return the delay in seconds from a Retry-After header, if it gives one."""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        # Missing, or an HTTP date, which OpenRouter does not send
+        return None
+
 
 class RevenueAgentError(Exception):
     """Base exception for revenue agent errors."""
@@ -24,6 +204,14 @@ class APIError(RevenueAgentError):
     pass
 
 
+class RateLimitError(APIError):
+    """Exception raised when the API rejects a request for exceeding its rate limit."""
+    
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
 class ValidationError(RevenueAgentError):
     """Exception raised for input validation errors."""
     pass
@@ -54,11 +242,31 @@ class DeepSeekRevenueAgent:
             self.max_tokens = Config.DEEPSEEK_MAX_TOKENS
             self.base_url = "https://openrouter.ai/api/v1/chat/completions"
             self.web_search = BraveWebSearch()
+            self.response_cache = get_response_cache(self.temperature)
+            
+            # Analyses currently running, keyed on normalized (company, domain)
+            self._inflight: Dict[Tuple[str, str], Future] = {}
+            # Recent completed analyses, least recently used first
+            self._analysis_cache: "OrderedDict[Tuple[str, str], Dict]" = OrderedDict()
+            self._inflight_lock = threading.Lock()
+            
+            # Request parts that never change between calls
+            self._base_headers = {
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json",
+                "HTTP-Referer": "https://langgraph-agent-project",
+                "X-Title": "Company Revenue Analysis"
+            }
+            self._payload_template = {
+                "model": self.model,
+                "temperature": self.temperature,
+                "max_tokens": self.max_tokens
+            }
             
             logger.info("DeepSeekRevenueAgent initialized successfully")
             
         except Exception as e:
-            logger.error(f"Failed to initialize DeepSeekRevenueAgent: {str(e)}")
+            logger.error("Failed to initialize DeepSeekRevenueAgent: %s", e)
             raise ConfigurationError(f"Initialization failed: {str(e)}")
     
     def _validate_input(self, company_name: str, company_domain: str = "") -> None:
@@ -78,94 +286,138 @@ class DeepSeekRevenueAgent:
             company_domain = company_domain.strip()
         
         # Basic validation for domain format
-        if company_domain and not re.match(r'^[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', company_domain):
-            logger.warning(f"Company domain '{company_domain}' may not be in valid format")
+        if company_domain and not _looks_like_domain(company_domain):
+            logger.warning("Company domain '%s' may not be in valid format", company_domain)
     
-    def _retry_api_call(self, func, max_retries: int = 3, base_delay: float = 1.0):
-        """Retry API calls with exponential backoff."""
+    def _retry_api_call(self, func, max_retries: int = 3, base_delay: float = 1.0, max_delay: float = 30.0):
+        """Retry API calls with jittered exponential backoff, honouring Retry-After on 429s up to max_delay."""
         for attempt in range(max_retries):
             try:
                 return func()
             except (requests.exceptions.RequestException, APIError) as e:
                 if attempt == max_retries - 1:
-                    logger.error(f"API call failed after {max_retries} attempts: {str(e)}")
+                    logger.error("API call failed after %s attempts: %s", max_retries, e)
                     raise APIError(f"API call failed after {max_retries} attempts: {str(e)}")
                 
-                delay = base_delay * (2 ** attempt)
-                logger.warning(f"API call failed (attempt {attempt + 1}/{max_retries}), retrying in {delay}s: {str(e)}")
+                # Full jitter keeps parallel workers from retrying in lockstep,
+                # unless the server said how long to wait; a huge Retry-After must not stall a worker
+                delay = random.uniform(0, base_delay * (2 ** attempt))
+                if isinstance(e, RateLimitError) and e.retry_after is not None:
+                    delay = min(e.retry_after, max_delay)
+                logger.warning("API call failed (attempt %s/%s), retrying in %.1fs: %s", attempt + 1, max_retries, delay, e)
                 time.sleep(delay)
         
         raise APIError("Unexpected error in retry logic")
     
-    def _call_deepseek(self, messages: List[Dict]) -> str:
-        """Call DeepSeek model via OpenRouter API with comprehensive error handling."""
+    def _call_deepseek(self, messages: List[Dict], response_format: Optional[Dict] = None,
+                       stream_json: bool = False) -> str:
+        """
+        Call DeepSeek model via OpenRouter API with comprehensive error handling.
+        
+        With stream_json, the completion is streamed and the connection is closed
+        as soon as the first JSON object in it is complete; for callers that only
+        parse that object.
+        """
         if not messages or not isinstance(messages, list):
             raise ValidationError("Messages must be a non-empty list")
         
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-            "HTTP-Referer": "https://langgraph-agent-project",
-            "X-Title": "Company Revenue Analysis"
-        }
+        payload = {**self._payload_template, "messages": messages}
         
-        payload = {
-            "model": self.model,
-            "messages": messages,
-            "temperature": self.temperature,
-            "max_tokens": self.max_tokens
-        }
+        if response_format:
+            payload["response_format"] = response_format
+        
+        # Identical requests at temperature 0 are answered from the response cache
+        cache_prompt = cache_llm_string = None
+        if self.response_cache is not None:
+            cache_prompt = orjson.dumps(messages).decode()
+            cache_llm_string = orjson.dumps(
+                {k: v for k, v in payload.items() if k != "messages"},
+                option=orjson.OPT_SORT_KEYS
+            ).decode()
+            cached = self.response_cache.lookup(cache_prompt, cache_llm_string)
+            if cached:
+                logger.info("Using cached DeepSeek response")
+                return cached[0].text
+        
+        # Serialized once, so retries resend the same bytes
+        body = orjson.dumps({**payload, "stream": True} if stream_json else payload)
+        
+        # Rough upper bound on the tokens this request can use (~4 bytes per token)
+        token_limiter = get_openrouter_token_limiter()
+        estimated_tokens = len(body) // 4 + self.max_tokens
         
         def make_request():
-            logger.info(f"Making API request to DeepSeek with model: {self.model}")
-            response = requests.post(
+            logger.info("Making API request to DeepSeek with model: %s", self.model)
+            # Shared with the contact agent, including retries
+            get_openrouter_limiter().acquire()
+            if token_limiter is not None:
+                token_limiter.acquire(estimated_tokens)
+            response = _session.post(
                 self.base_url,
-                headers=headers,
-                json=payload,
-                timeout=60
+                headers=self._base_headers,
+                data=body,
+                timeout=(5, 60),
+                stream=stream_json
             )
             
             # Log response status for debugging
-            logger.info(f"API response status: {response.status_code}")
+            logger.info("API response status: %s", response.status_code)
             
             if response.status_code == 401:
                 raise APIError("Invalid API key or unauthorized access")
             elif response.status_code == 429:
-                raise APIError("Rate limit exceeded. Please try again later.")
+                raise RateLimitError(
+                    "Rate limit exceeded. Please try again later.",
+                    retry_after=_parse_retry_after(response.headers.get("Retry-After"))
+                )
             elif response.status_code == 500:
                 raise APIError("Internal server error from OpenRouter API")
             elif response.status_code >= 400:
                 raise APIError(f"API request failed with status {response.status_code}: {response.text}")
             
             response.raise_for_status()
+            
+            # Read inside the retry so a stream dropped midway is retried too
+            if stream_json:
+                return _read_streamed_content(response)
             return response
         
         try:
             response = self._retry_api_call(make_request)
-            result = response.json()
-            
-            # Validate response structure
-            if "choices" not in result:
-                raise DataProcessingError("Invalid API response: missing 'choices' field")
             
-            if not result["choices"] or len(result["choices"]) == 0:
-                raise DataProcessingError("Invalid API response: empty choices array")
+            if stream_json:
+                # make_request already read the streamed content
+                content = response
+            else:
+                result = orjson.loads(response.content)
+                
+                # Validate response structure
+                if "choices" not in result:
+                    raise DataProcessingError("Invalid API response: missing 'choices' field")
+                
+                if not result["choices"] or len(result["choices"]) == 0:
+                    raise DataProcessingError("Invalid API response: empty choices array")
+                
+                if "message" not in result["choices"][0]:
+                    raise DataProcessingError("Invalid API response: missing 'message' field")
+                
+                if "content" not in result["choices"][0]["message"]:
+                    raise DataProcessingError("Invalid API response: missing 'content' field")
+                
+                content = result["choices"][0]["message"]["content"]
             
-            if "message" not in result["choices"][0]:
-                raise DataProcessingError("Invalid API response: missing 'message' field")
+            logger.info("Successfully received response from DeepSeek API")
             
-            if "content" not in result["choices"][0]["message"]:
-                raise DataProcessingError("Invalid API response: missing 'content' field")
+            if self.response_cache is not None and content:
+                self.response_cache.update(cache_prompt, cache_llm_string, [Generation(text=content)])
             
-            content = result["choices"][0]["message"]["content"]
-            logger.info("Successfully received response from DeepSeek API")
             return content
             
         except requests.exceptions.Timeout:
             raise APIError("Request timeout: The API call took too long to respond")
         except requests.exceptions.ConnectionError:
             raise APIError("Connection error: Unable to connect to the API")
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             raise DataProcessingError(f"Failed to parse API response as JSON: {str(e)}")
         except Exception as e:
             if isinstance(e, (APIError, DataProcessingError)):
@@ -178,47 +430,60 @@ class DeepSeekRevenueAgent:
             # Validate inputs
             self._validate_input(company_name, company_domain)
             
-            logger.info(f"Searching for financial information for: {company_name}")
+            logger.info("Searching for financial information for: %s", company_name)
             
             # Search for company revenue information
             results = self.web_search.search_company_revenue(company_name, company_domain)
             
             if not results:
-                logger.warning(f"No financial information found for {company_name}")
+                logger.warning("No financial information found for %s", company_name)
                 return f"No financial information found for {company_name}."
             
-            # Format results safely
-            formatted_results = []
-            for i, result in enumerate(results[:5], 1):
-                try:
-                    title = result.get('title', 'No title') if result else 'No title'
-                    url = result.get('url', 'No URL') if result else 'No URL'
-                    description = result.get('description', 'No description') if result else 'No description'
-                    published_date = result.get('published_date', 'Unknown') if result else 'Unknown'
-                    
-                    formatted_results.append(
-                        f"{i}. {title}\n"
-                        f"   URL: {url}\n"
-                        f"   Description: {description}\n"
-                        f"   Published: {published_date}\n"
-                    )
-                except Exception as e:
-                    logger.warning(f"Error formatting result {i}: {str(e)}")
-                    continue
+            # Format results, skipping any that are not dictionaries
+            formatted_results = [
+                f"{i}. {result.get('title', 'No title')}\n"
+                f"   URL: {result.get('url', 'No URL')}\n"
+                f"   Description: {result.get('description', 'No description')}\n"
+                f"   Published: {result.get('published_date', 'Unknown')}\n"
+                for i, result in enumerate(results[:5], 1)
+                if isinstance(result, dict)
+            ]
             
             if not formatted_results:
-                logger.warning(f"Failed to format any results for {company_name}")
+                logger.warning("Failed to format any results for %s", company_name)
                 return f"Found results but failed to format them for {company_name}."
             
-            logger.info(f"Successfully formatted {len(formatted_results)} results for {company_name}")
+            logger.info("Successfully formatted %s results for %s", len(formatted_results), company_name)
             return "\n".join(formatted_results)
             
         except ValidationError:
             raise
         except Exception as e:
-            logger.error(f"Error searching company financials for {company_name}: {str(e)}")
+            logger.error("Error searching company financials for %s: %s", company_name, e)
             raise DataProcessingError(f"Failed to search financial information: {str(e)}")
     
+    def _parse_revenue_data(self, data: Dict) -> Tuple[Optional[float], str]:
+        """Convert a parsed model answer into (revenue_usd, citation)."""
+        revenue = data.get("revenue_usd")
+        source = data.get("source_url", "")
+        confidence = data.get("confidence", "low")
+        reasoning = data.get("reasoning", "")
+        
+        # Accept numbers and numeric strings, keeping only finite, non-negative values;
+        # bool is an int subclass but never a revenue figure
+        value = None
+        if isinstance(revenue, (int, float, str)) and not isinstance(revenue, bool):
+            try:
+                value = float(revenue)
+            except ValueError:
+                pass
+        if value is not None and not (math.isfinite(value) and value >= 0):
+            value = None
+        if revenue is not None and value is None:
+            logger.warning("Invalid revenue value: %s", revenue)
+        
+        return value, f"{source} (Confidence: {confidence}) - {reasoning}"
+    
     def extract_revenue_from_sources(self, company_name: str, search_results: str) -> Tuple[Optional[float], str]:
         """
         Use DeepSeek to extract revenue information from search results with comprehensive error handling.
@@ -238,112 +503,176 @@ class DeepSeekRevenueAgent:
             if not search_results or not isinstance(search_results, str):
                 raise ValidationError("Search results must be a non-empty string")
             
-            logger.info(f"Extracting revenue information for: {company_name}")
+            logger.info("Extracting revenue information for: %s", company_name)
             
-            prompt = f"""
-You are a financial analyst tasked with extracting the most recent annual revenue for {company_name}.
-
-Based on the following search results, please:
-1. Find the most recent annual operating revenue. If not available, use an estimate.
-2. Convert it to USD if it's in another currency
-3. Provide the specific source URL where you found this information
-4. If you cannot find reliable revenue from data, state that clearly
-
-Search Results:
-{search_results}
-
-Please respond in the following JSON format:
-{{
-    "revenue_usd": <number in USD or null if not found>,
-    "source_url": "<URL of the source or empty string if not found>",
-    "confidence": "<high/medium/low>",
-    "reasoning": "<brief explanation of how you arrived at this conclusion>"
-}}
-
-Important notes:
-- Prefer official financial reports, SEC filings, or investor relations pages
-- Use the most recent data available
-- If multiple sources conflict, choose the most authoritative one
-- Convert currencies using approximate exchange rates if needed
-- Use estimates from relevant sources if needed
-"""
-
             messages = [
-                {"role": "user", "content": prompt}
+                {"role": "system", "content": _SINGLE_SYSTEM_PROMPT},
+                {"role": "user", "content": f"Company: {company_name}\n\nSearch Results:\n{search_results}"}
             ]
             
-            response = self._call_deepseek(messages)
+            response = self._call_deepseek(messages, stream_json=True)
             
             if not response or not isinstance(response, str):
                 logger.error("Received empty or invalid response from DeepSeek API")
                 return None, "Failed to get response from AI model"
             
-            # Try to parse JSON response with multiple strategies
-            try:
-                # Strategy 1: Look for JSON block in response
-                json_match = re.search(r'\{.*\}', response, re.DOTALL)
-                if json_match:
-                    json_str = json_match.group()
-                    data = json.loads(json_str)
-                    
-                    # Validate required fields
-                    revenue = data.get("revenue_usd")
-                    source = data.get("source_url", "")
-                    confidence = data.get("confidence", "low")
-                    reasoning = data.get("reasoning", "")
-                    
-                    # Validate revenue value if present
-                    if revenue is not None:
-                        try:
-                            revenue = float(revenue)
-                            if revenue < 0:
-                                logger.warning(f"Negative revenue value detected: {revenue}")
-                                revenue = None
-                        except (ValueError, TypeError):
-                            logger.warning(f"Invalid revenue value: {revenue}")
-                            revenue = None
-                    
-                    logger.info(f"Successfully extracted revenue data for {company_name}")
-                    return revenue, f"{source} (Confidence: {confidence}) - {reasoning}"
-                
-                # Strategy 2: Try to parse entire response as JSON
+            # Parse the JSON object, ignoring any prose around it
+            json_str = _extract_json_object(response)
+            data = None
+            if json_str is not None:
                 try:
-                    data = json.loads(response)
-                    revenue = data.get("revenue_usd")
-                    source = data.get("source_url", "")
-                    confidence = data.get("confidence", "low")
-                    reasoning = data.get("reasoning", "")
-                    
-                    if revenue is not None:
-                        revenue = float(revenue)
-                    
-                    return revenue, f"{source} (Confidence: {confidence}) - {reasoning}"
-                except json.JSONDecodeError:
-                    pass
-                
-                # Strategy 3: Fallback - return raw response
-                logger.warning(f"Could not parse JSON from response for {company_name}")
-                return None, f"Could not parse structured response: {response[:200]}..."
-                
-            except json.JSONDecodeError as e:
-                logger.error(f"JSON parsing error for {company_name}: {str(e)}")
-                return None, f"Invalid JSON response: {str(e)}"
-            except Exception as e:
-                logger.error(f"Error processing response for {company_name}: {str(e)}")
-                return None, f"Error processing AI response: {str(e)}"
-                
+                    data = orjson.loads(json_str)
+                except orjson.JSONDecodeError as e:
+                    logger.error("JSON parsing error for %s: %s", company_name, e)
+            
+            if isinstance(data, dict):
+                logger.info("Successfully extracted revenue data for %s", company_name)
+                return self._parse_revenue_data(data)
+            
+            # Fallback - return raw response
+            logger.warning("Could not parse JSON from response for %s", company_name)
+            return None, f"Could not parse structured response: {response[:200]}..."
+            
         except ValidationError:
             raise
         except APIError:
             raise
         except Exception as e:
-            logger.error(f"Unexpected error extracting revenue for {company_name}: {str(e)}")
+            logger.error("Unexpected error extracting revenue for %s: %s", company_name, e)
             raise DataProcessingError(f"Failed to extract revenue information: {str(e)}")
     
+    def extract_revenues_batch(self, companies: List[Tuple[str, str]]) -> List[Tuple[Optional[float], str]]:
+        """
+        Extract revenue for several companies with a single DeepSeek call.
+        
+        Companies missing from the batched answer (or every company, if the answer
+        cannot be parsed) fall back to one extract_revenue_from_sources call each.
+        
+        Args:
+            companies: List of (company_name, search_results) tuples
+            
+        Returns:
+            List of (estimated_revenue_in_usd, citation_source) tuples, one per company
+        """
+        if not companies:
+            return []
+        
+        logger.info("Extracting revenue information for a batch of %s companies", len(companies))
+        
+        sections = []
+        for i, (company_name, search_results) in enumerate(companies, 1):
+            sections.append(
+                f"### Company {i}: {company_name}\n"
+                f"Search Results:\n{search_results}\n"
+            )
+        
+        messages = [
+            {"role": "system", "content": _BATCH_SYSTEM_PROMPT},
+            {"role": "user", "content": f"Companies ({len(companies)}):\n\n" + "\n".join(sections)}
+        ]
+        
+        parsed: Dict[int, Tuple[Optional[float], str]] = {}
+        try:
+            response = self._call_deepseek(messages, response_format={"type": "json_object"}, stream_json=True)
+            json_str = _extract_json_object(response or "")
+            data = orjson.loads(json_str) if json_str else {}
+            
+            for entry in data.get("results", []):
+                if isinstance(entry, dict) and isinstance(entry.get("index"), int):
+                    parsed[entry["index"]] = self._parse_revenue_data(entry)
+        except (APIError, DataProcessingError) as e:
+            logger.error("Batched revenue extraction failed: %s", e)
+            return [(None, f"Revenue extraction failed: {str(e)}") for _ in companies]
+        except (orjson.JSONDecodeError, AttributeError) as e:
+            logger.warning("Could not parse batched revenue response: %s", e)
+        
+        results = []
+        for i, (company_name, search_results) in enumerate(companies, 1):
+            if i in parsed:
+                results.append(parsed[i])
+                continue
+            
+            # Fall back to a single-company call for anything the batch answer missed
+            logger.warning("Batched response missing %s, retrying individually", company_name)
+            try:
+                results.append(self.extract_revenue_from_sources(company_name, search_results))
+            except Exception as e:
+                logger.error("Revenue extraction failed for %s: %s", company_name, e)
+                results.append((None, f"Revenue extraction failed: {str(e)}"))
+        
+        return results
+    
+    def _search_for_analysis(self, company_name: str, company_domain: str) -> str:
+        """Search for financial information, returning the failure reason as text on error."""
+        try:
+            search_results = self.search_company_financials(company_name, company_domain)
+            logger.info("Search completed for %s", company_name)
+            return search_results
+        except Exception as e:
+            logger.error("Search failed for %s: %s", company_name, e)
+            return f"Search failed: {str(e)}"
+    
+    def _analysis_result(self, company_name: str, company_domain: str, revenue: Optional[float],
+                         citation: str, search_results: str) -> Dict:
+        """Build the analysis result dictionary for a company."""
+        result = {
+            "company_name": company_name,
+            "company_domain": company_domain,
+            "estimated_revenue_usd": revenue,
+            "citation": citation,
+            "search_results": search_results,
+            "status": "success" if revenue is not None else "partial",
+            "timestamp": time.time()
+        }
+        
+        logger.info("Analysis completed for %s with status: %s", company_name, result['status'])
+        return result
+    
+    def _failed_analysis(self, company_name: str, company_domain: str, error: Exception) -> Dict:
+        """Build the result dictionary for a company whose analysis failed."""
+        return {
+            "company_name": company_name,
+            "company_domain": company_domain,
+            "estimated_revenue_usd": None,
+            "citation": f"Analysis failed: {str(error)}",
+            "search_results": "",
+            "status": "failed",
+            "timestamp": time.time(),
+            "error": str(error)
+        }
+    
+    @staticmethod
+    def _analysis_key(company_name: str, company_domain: str) -> Tuple[str, str]:
+        """Key identifying the same company and domain, ignoring case and surrounding spaces."""
+        return str(company_name).strip().lower(), str(company_domain or "").strip().lower()
+    
+    def _cached_analysis(self, key: Tuple[str, str]) -> Optional[Dict]:
+        """Return a copy of a remembered analysis, or None. Caller must hold the lock."""
+        cached = self._analysis_cache.get(key)
+        if cached is None:
+            return None
+        self._analysis_cache.move_to_end(key)
+        return dict(cached)
+    
+    def _remember_analysis(self, key: Tuple[str, str], result: Dict) -> None:
+        """Remember an analysis whose revenue was extracted. Caller must hold the lock."""
+        # Partial results include transient search or API failures, so they are retried
+        if result["status"] != "success":
+            return
+        self._analysis_cache[key] = result
+        if len(self._analysis_cache) > _ANALYSIS_CACHE_SIZE:
+            self._analysis_cache.popitem(last=False)
+    
     def analyze_company_revenue(self, company_name: str, company_domain: str = "") -> Dict:
         """
         Complete analysis of company revenue with comprehensive error handling.
         
+        Concurrent calls for the same company and domain (ignoring case and
+        surrounding spaces) share one analysis instead of each searching and
+        calling DeepSeek, and later calls reuse the completed result. Only
+        analyses that found a revenue figure are remembered; failed and partial
+        ones are retried on the next call.
+        
         Args:
             company_name: Name of the company
             company_domain: Optional company domain
@@ -351,65 +680,130 @@ Important notes:
         Returns:
             Dictionary with revenue analysis results
         """
+        key = self._analysis_key(company_name, company_domain)
+        with self._inflight_lock:
+            cached = self._cached_analysis(key)
+            if cached is not None:
+                return cached
+            
+            future = self._inflight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = self._inflight[key] = Future()
+        
+        if not is_leader:
+            logger.info("Joining in-flight revenue analysis for: %s", company_name)
+            return dict(future.result())
+        
+        result = None
+        try:
+            result = self._analyze_company_revenue(company_name, company_domain)
+            future.set_result(result)
+            return dict(result)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+                if result is not None:
+                    self._remember_analysis(key, result)
+    
+    def _analyze_company_revenue(self, company_name: str, company_domain: str) -> Dict:
+        """Search and extract revenue for one company, without coalescing duplicate calls."""
         try:
             # Validate inputs
             self._validate_input(company_name, company_domain)
             
-            logger.info(f"Starting revenue analysis for: {company_name}")
+            logger.info("Starting revenue analysis for: %s", company_name)
             
             # Step 1: Search for financial information
-            try:
-                search_results = self.search_company_financials(company_name, company_domain)
-                logger.info(f"Search completed for {company_name}")
-            except Exception as e:
-                logger.error(f"Search failed for {company_name}: {str(e)}")
-                search_results = f"Search failed: {str(e)}"
+            search_results = self._search_for_analysis(company_name, company_domain)
             
             # Step 2: Extract revenue using DeepSeek
             try:
                 revenue, citation = self.extract_revenue_from_sources(company_name, search_results)
-                logger.info(f"Revenue extraction completed for {company_name}")
+                logger.info("Revenue extraction completed for %s", company_name)
             except Exception as e:
-                logger.error(f"Revenue extraction failed for {company_name}: {str(e)}")
+                logger.error("Revenue extraction failed for %s: %s", company_name, e)
                 revenue = None
                 citation = f"Revenue extraction failed: {str(e)}"
             
-            result = {
-                "company_name": company_name,
-                "company_domain": company_domain,
-                "estimated_revenue_usd": revenue,
-                "citation": citation,
-                "search_results": search_results,
-                "status": "success" if revenue is not None else "partial",
-                "timestamp": time.time()
-            }
-            
-            logger.info(f"Analysis completed for {company_name} with status: {result['status']}")
-            return result
+            return self._analysis_result(company_name, company_domain, revenue, citation, search_results)
             
         except ValidationError:
             raise
         except Exception as e:
-            logger.error(f"Complete analysis failed for {company_name}: {str(e)}")
+            logger.error("Complete analysis failed for %s: %s", company_name, e)
             # Return partial results even if analysis fails
-            return {
-                "company_name": company_name,
-                "company_domain": company_domain,
-                "estimated_revenue_usd": None,
-                "citation": f"Analysis failed: {str(e)}",
-                "search_results": "",
-                "status": "failed",
-                "timestamp": time.time(),
-                "error": str(e)
-            }
+            return self._failed_analysis(company_name, company_domain, e)
+    
+    def analyze_companies_batch(self, companies: List[Tuple[str, str]]) -> List[Dict]:
+        """
+        Analyze several companies, sharing one DeepSeek call for revenue extraction.
+        
+        Searches are issued concurrently; companies that fail input validation are
+        returned as failed results instead of raising. Analyses remembered by
+        analyze_company_revenue or an earlier batch are reused, and successful
+        ones from this batch are remembered in turn.
+        
+        Args:
+            companies: List of (company_name, company_domain) tuples
+            
+        Returns:
+            List of revenue analysis dictionaries, in the same order as ``companies``
+        """
+        results: List[Optional[Dict]] = [None] * len(companies)
+        valid = []
+        
+        for i, (company_name, company_domain) in enumerate(companies):
+            try:
+                self._validate_input(company_name, company_domain)
+                valid.append(i)
+            except ValidationError as e:
+                results[i] = self._failed_analysis(company_name, company_domain, e)
+        
+        with self._inflight_lock:
+            for i in valid:
+                results[i] = self._cached_analysis(self._analysis_key(*companies[i]))
+        valid = [i for i in valid if results[i] is None]
+        
+        if not valid:
+            return results
+        
+        logger.info("Starting batched revenue analysis for %s companies", len(valid))
+        
+        # Step 1: Searches are independent, so run them concurrently
+        with ThreadPoolExecutor(max_workers=len(valid)) as executor:
+            search_results = list(executor.map(lambda i: self._search_for_analysis(*companies[i]), valid))
+        
+        # Step 2: Extract every revenue figure with one DeepSeek call
+        extractions = self.extract_revenues_batch(
+            [(companies[i][0], results_text) for i, results_text in zip(valid, search_results)]
+        )
+        
+        for i, results_text, (revenue, citation) in zip(valid, search_results, extractions):
+            company_name, company_domain = companies[i]
+            results[i] = self._analysis_result(company_name, company_domain, revenue, citation, results_text)
+        
+        with self._inflight_lock:
+            for i in valid:
+                self._remember_analysis(self._analysis_key(*companies[i]), dict(results[i]))
+        
+        return results
 
 
+@lru_cache(maxsize=1)
 def create_revenue_agent_tools():
-    """Create LangChain tools for the revenue agent with error handling."""
+    """Create LangChain tools for the revenue agent with error handling.
+    
+    The tools are stateless wrappers around one agent, so they are built once and
+    shared by every caller; a failed build is not cached and is retried next call.
+    """
     try:
         agent = DeepSeekRevenueAgent()
     except Exception as e:
-        logger.error(f"Failed to create revenue agent: {str(e)}")
+        logger.error("Failed to create revenue agent: %s", e)
         raise ConfigurationError(f"Failed to initialize revenue agent: {str(e)}")
     
     @tool
@@ -429,7 +823,7 @@ def create_revenue_agent_tools():
         except ValidationError as e:
             return f"Validation error: {str(e)}"
         except Exception as e:
-            logger.error(f"Error in search_company_financials tool: {str(e)}")
+            logger.error("Error in search_company_financials tool: %s", e)
             return f"Search failed: {str(e)}"
     
     @tool
@@ -455,7 +849,7 @@ def create_revenue_agent_tools():
                 "status": "success" if revenue is not None else "partial"
             }
             
-            return json.dumps(result, indent=2)
+            return orjson.dumps(result).decode()
             
         except ValidationError as e:
             error_result = {
@@ -465,9 +859,9 @@ def create_revenue_agent_tools():
                 "status": "failed",
                 "error": str(e)
             }
-            return json.dumps(error_result, indent=2)
+            return orjson.dumps(error_result).decode()
         except Exception as e:
-            logger.error(f"Error in extract_revenue_from_sources tool: {str(e)}")
+            logger.error("Error in extract_revenue_from_sources tool: %s", e)
             error_result = {
                 "revenue_usd": None,
                 "citation": f"Extraction failed: {str(e)}",
@@ -475,9 +869,10 @@ def create_revenue_agent_tools():
                 "status": "failed",
                 "error": str(e)
             }
-            return json.dumps(error_result, indent=2)
+            return orjson.dumps(error_result).decode()
     
-    return [search_company_financials, extract_revenue_from_sources]
+    # A tuple, since every caller receives the same cached object
+    return (search_company_financials, extract_revenue_from_sources)
 
 
 if __name__ == "__main__":
@@ -523,6 +918,6 @@ if __name__ == "__main__":
         print(f"Data Processing Error: {str(e)}")
     except Exception as e:
         print(f"Unexpected Error: {str(e)}")
-        logger.error(f"Unexpected error in main: {str(e)}")
+        logger.error("Unexpected error in main: %s", e)
 
 
@@ -0,0 +1,116 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from functools import lru_cache
+from typing import Any, List, Optional, Tuple
+from langchain_core.caches import BaseCache, RETURN_VAL_TYPE
+from langchain_core.load import dumps, loads
+from src.cache.store import SQLiteStore
+from src.config.settings import Config
+
+
+class AgentResponseCache(BaseCache):
+    """Exact-match LangChain cache for chat model responses.
+    
+    Hits are served from memory first and fall back to a persistent SQLite store,
+    so identical prompts are answered without a provider call across runs.
+    Responses that request tool calls are never stored.
+    
+    Entries are scoped to a namespace, so changing it (for example, per day)
+    starts from an empty cache without deleting older entries. Entries expire
+    after ttl_seconds when given, in memory as well as on disk, and only the
+    max_memory_entries most recently used responses are kept in memory.
+    """
+    
+    def __init__(self, db_path: str, namespace: str = "", ttl_seconds: Optional[float] = None,
+                 max_memory_entries: int = 1024):
+        self._store = SQLiteStore(db_path)
+        # key -> (expires_at, payload), least recently used first
+        self._memory: "OrderedDict[str, Tuple[Optional[float], List[str]]]" = OrderedDict()
+        self._memory_lock = threading.Lock()
+        self.max_memory_entries = max_memory_entries
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+    
+    def _key(self, prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(
+            f"{self.namespace}\x00{llm_string}\x00{prompt}".encode("utf-8")
+        ).hexdigest()
+    
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        """Look up a cached response for the prompt and model configuration."""
+        key = self._key(prompt, llm_string)
+        
+        with self._memory_lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, payload = entry
+                if expires_at is None or expires_at >= time.time():
+                    self._memory.move_to_end(key)
+                    return [loads(generation) for generation in payload]
+                del self._memory[key]
+        
+        entry = self._store.get_with_expiry(key)
+        if entry is None:
+            return None
+        payload, expires_at = entry
+        self._remember(key, expires_at, payload)
+        
+        return [loads(generation) for generation in payload]
+    
+    def _remember(self, key: str, expires_at: Optional[float], payload: List[str]) -> None:
+        with self._memory_lock:
+            self._memory[key] = (expires_at, payload)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+    
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        """Store a response unless it asks for tool calls."""
+        for generation in return_val:
+            message = getattr(generation, "message", None)
+            if getattr(message, "tool_calls", None):
+                return
+        
+        key = self._key(prompt, llm_string)
+        payload = [dumps(generation) for generation in return_val]
+        
+        expires_at = time.time() + self.ttl_seconds if self.ttl_seconds is not None else None
+        self._remember(key, expires_at, payload)
+        self._store.set(key, payload, ttl_seconds=self.ttl_seconds)
+    
+    def clear(self, **kwargs: Any) -> None:
+        """Clear both the in-memory and persistent caches."""
+        with self._memory_lock:
+            self._memory.clear()
+        self._store.clear()
+
+
+@lru_cache(maxsize=None)
+def _get_daily_cache(namespace: str) -> AgentResponseCache:
+    return AgentResponseCache(
+        Config.AGENT_CACHE_PATH,
+        namespace=namespace,
+        ttl_seconds=Config.LLM_CACHE_TTL_HOURS * 3600
+    )
+
+
+def get_response_cache(temperature: float) -> Optional[AgentResponseCache]:
+    """
+    Return the shared LLM response cache for today's runs.
+    
+    Reruns on the same day reuse responses while a new day regenerates them.
+    Caching sampled responses would pin one random answer, so None is returned
+    for any temperature above 0 or when LLM_CACHE_TTL_HOURS is 0.
+    
+    Args:
+        temperature: Sampling temperature of the model being cached
+        
+    Returns:
+        AgentResponseCache instance, or None when caching is disabled
+    """
+    if temperature > 0 or Config.LLM_CACHE_TTL_HOURS <= 0:
+        return None
+    return _get_daily_cache(f"shipsy::{date.today().isoformat()}")
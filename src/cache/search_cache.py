@@ -0,0 +1,78 @@
+import hashlib
+import logging
+import threading
+import time
+from functools import lru_cache
+from typing import Callable, Dict, Tuple
+from src.cache.store import SQLiteStore
+from src.config.settings import Config
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Recent failed responses with their monotonic expiry time; kept apart from the
+# persistent store so an error is never served once it has expired
+_recent_errors: Dict[str, Tuple[float, Dict]] = {}
+_recent_errors_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def _get_store() -> SQLiteStore:
+    """Open the search cache database once per process."""
+    return SQLiteStore(Config.SEARCH_CACHE_PATH)
+
+
+def _key(query: str) -> str:
+    # Brave matching ignores case and spacing, so "Apple Inc" and "apple  inc" share an entry
+    normalized = " ".join(query.lower().split())
+    return hashlib.sha256(f"brave::{normalized}".encode("utf-8")).hexdigest()
+
+
+def get_or_fetch(query: str, fetch_fn: Callable[[], Dict], ttl_hours: float = None) -> Dict:
+    """
+    Return the cached search response for a query, calling fetch_fn on a miss.
+    
+    Responses carrying an "error" key are never stored on disk, so failed searches
+    are retried on the next run; within a run they are remembered in memory for
+    Config.SEARCH_ERROR_CACHE_SECONDS, so a failing query is not re-sent in a
+    tight loop. A ttl_hours of 0 disables the cache.
+    
+    Args:
+        query: Search query the response belongs to
+        fetch_fn: Zero-argument callable that performs the search
+        ttl_hours: Hours before a cached response expires (default from config)
+        
+    Returns:
+        Search response dictionary
+    """
+    if ttl_hours is None:
+        ttl_hours = Config.SEARCH_CACHE_TTL_HOURS
+    
+    if ttl_hours <= 0:
+        return fetch_fn()
+    
+    store = _get_store()
+    key = _key(query)
+    
+    cached = store.get(key)
+    if cached is not None:
+        logger.info(f"Search cache hit for query: {query[:100]}")
+        return cached
+    
+    with _recent_errors_lock:
+        recent = _recent_errors.get(key)
+        if recent is not None and recent[0] <= time.monotonic():
+            del _recent_errors[key]
+            recent = None
+    if recent is not None:
+        logger.info(f"Reusing recent search failure for query: {query[:100]}")
+        return recent[1]
+    
+    result = fetch_fn()
+    if "error" not in result:
+        store.set(key, result, ttl_seconds=ttl_hours * 3600)
+    elif Config.SEARCH_ERROR_CACHE_SECONDS > 0:
+        with _recent_errors_lock:
+            _recent_errors[key] = (time.monotonic() + Config.SEARCH_ERROR_CACHE_SECONDS, result)
+    
+    return result
@@ -0,0 +1,74 @@
+import sqlite3
+import threading
+import time
+import zlib
+import orjson
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+
+class SQLiteStore:
+    """Persistent key/value store with per-entry expiry, backed by a single SQLite table.
+
+    Values are JSON-serialized and zlib-compressed. The connection is shared across
+    threads and guarded by a lock so the store can be used from worker pools.
+    """
+    
+    def __init__(self, db_path: str):
+        path = Path(db_path).expanduser()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache "
+                "(key TEXT PRIMARY KEY, value BLOB, expires_at REAL)"
+            )
+            self._conn.commit()
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Return the value stored under key, or None if it is missing or expired."""
+        entry = self.get_with_expiry(key)
+        return None if entry is None else entry[0]
+    
+    def get_with_expiry(self, key: str) -> Optional[Tuple[Any, Optional[float]]]:
+        """Return (value, expires_at) for key, or None if it is missing or expired."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+        
+        if row is None:
+            return None
+        
+        value, expires_at = row
+        if expires_at is not None and expires_at < time.time():
+            self.delete(key)
+            return None
+        
+        return orjson.loads(zlib.decompress(value)), expires_at
+    
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """Store value under key, optionally expiring after ttl_seconds."""
+        expires_at = time.time() + ttl_seconds if ttl_seconds is not None else None
+        blob = zlib.compress(orjson.dumps(value))
+        
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, blob, expires_at)
+            )
+            self._conn.commit()
+    
+    def delete(self, key: str) -> None:
+        """Remove key from the store if present."""
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._conn.commit()
+    
+    def clear(self) -> None:
+        """Remove every entry from the store."""
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
@@ -12,23 +12,38 @@ class Config:
     AGENT_MODEL = os.getenv("AGENT_MODEL", "gpt-4o-mini")
     AGENT_TEMPERATURE = float(os.getenv("AGENT_TEMPERATURE", "0.7"))
     AGENT_MAX_TOKENS = int(os.getenv("AGENT_MAX_TOKENS", "1000"))
+    AGENT_CACHE_PATH = os.getenv("AGENT_CACHE_PATH", os.path.expanduser("~/.cache/shipsy_agent.sqlite"))
+    LLM_CACHE_TTL_HOURS = float(os.getenv("LLM_CACHE_TTL_HOURS", "72"))
     
     # OpenRouter Configuration for DeepSeek
     OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
     DEEPSEEK_MODEL = os.getenv("DEEPSEEK_MODEL", "deepseek/deepseek-chat-v3.1:free")
     DEEPSEEK_TEMPERATURE = float(os.getenv("DEEPSEEK_TEMPERATURE", "0.3"))
     DEEPSEEK_MAX_TOKENS = int(os.getenv("DEEPSEEK_MAX_TOKENS", "2000"))
+    OPENROUTER_RPS = float(os.getenv("OPENROUTER_RPS", "5.0"))
+    OPENROUTER_TPM = int(os.getenv("OPENROUTER_TPM", "0"))  # 0 disables the token limit
     
     # Brave Search API Configuration
     BRAVE_API_KEY = os.getenv("BRAVE_API_KEY")
     BRAVE_SEARCH_COUNT = int(os.getenv("BRAVE_SEARCH_COUNT", "10"))
+    BRAVE_RPS = float(os.getenv("BRAVE_RPS", "1.0"))
+    SEARCH_CACHE_PATH = os.getenv("SEARCH_CACHE_PATH", os.path.expanduser("~/.cache/shipsy_search.sqlite"))
+    SEARCH_CACHE_TTL_HOURS = float(os.getenv("SEARCH_CACHE_TTL_HOURS", "24"))
+    SEARCH_ERROR_CACHE_SECONDS = float(os.getenv("SEARCH_ERROR_CACHE_SECONDS", "60"))
+    
+    # Set once validate() has passed; the values above are fixed at import
+    _validated = False
     
     @classmethod
     def validate(cls):
         """Validate that required configuration is present."""
+        if cls._validated:
+            return True
+        
         if not cls.OPENROUTER_API_KEY:
             raise ValueError("OPENROUTER_API_KEY is required. Please set it in your .env file.")
         if not cls.BRAVE_API_KEY:
             raise ValueError("BRAVE_API_KEY is required. Please set it in your .env file.")
         
+        cls._validated = True
         return True
@@ -1,9 +1,14 @@
-'''
 import pandas as pd
+import csv
+import orjson
 import logging
-from typing import List, Dict, Optional
+from dataclasses import fields
+from functools import cached_property
+from itertools import chain, islice
+from typing import List, Dict, Iterable, Iterator, Optional
 from pathlib import Path
 from src.agents.contact_agent import ContactEnrichmentAgent, ContactInfo
+from src.util.excel import write_sheet
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -16,44 +21,50 @@ class ContactCSVProcessor:
         """Initialize the contact CSV processor."""
         self.contact_agent = ContactEnrichmentAgent()
     
-    def read_contacts_csv(self, file_path: str) -> List[Dict[str, str]]:
+    def iter_contacts_csv(self, file_path: str) -> Iterator[Dict[str, str]]:
         """
-        Read contacts from a CSV file.
+        Lazily yield cleaned contacts from a CSV file without loading it into memory.
         
         Args:
             file_path: Path to the CSV file
             
-        Returns:
-            List of dictionaries with contact data
+        Yields:
+            Dictionaries with contact_name and company_name
         """
-        try:
-            df = pd.read_csv(file_path)
-            logger.info(f"Read {len(df)} contacts from {file_path}")
+        required_columns = ["contact_name", "company_name"]
+        
+        with open(file_path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.DictReader(f)
             
             # Validate required columns
-            required_columns = ["contact_name", "company_name"]
-            missing_columns = [col for col in required_columns if col not in df.columns]
-            
+            missing_columns = [col for col in required_columns if col not in (reader.fieldnames or [])]
             if missing_columns:
                 raise ValueError(f"Missing required columns: {missing_columns}")
             
-            # Convert to list of dictionaries
-            contacts = df[required_columns].to_dict('records')
-            
-            # Clean the data
-            cleaned_contacts = []
-            for contact in contacts:
-                cleaned_contact = {
-                    "contact_name": str(contact["contact_name"]).strip(),
-                    "company_name": str(contact["company_name"]).strip()
+            for row in reader:
+                contact = {
+                    "contact_name": (row["contact_name"] or "").strip(),
+                    "company_name": (row["company_name"] or "").strip()
                 }
                 
                 # Skip empty contacts
-                if cleaned_contact["contact_name"] and cleaned_contact["company_name"]:
-                    cleaned_contacts.append(cleaned_contact)
+                if contact["contact_name"] and contact["company_name"]:
+                    yield contact
                 else:
-                    logger.warning(f"Skipping contact with empty fields: {contact}")
+                    logger.warning(f"Skipping contact with empty fields: {row}")
+    
+    def read_contacts_csv(self, file_path: str) -> List[Dict[str, str]]:
+        """
+        Read contacts from a CSV file.
+        
+        Args:
+            file_path: Path to the CSV file
             
+        Returns:
+            List of dictionaries with contact data
+        """
+        try:
+            cleaned_contacts = list(self.iter_contacts_csv(file_path))
             logger.info(f"Processed {len(cleaned_contacts)} valid contacts")
             return cleaned_contacts
             
@@ -61,35 +72,51 @@ class ContactCSVProcessor:
             logger.error(f"Error reading CSV file {file_path}: {str(e)}")
             raise
     
-    def enrich_contacts_from_csv(self, input_file_path: str, output_file_path: str) -> List[ContactInfo]:
+    def enrich_contacts_from_csv(self, input_file_path: str, output_file_path: str,
+                                 chunk_size: int = 100) -> List[ContactInfo]:
         """
         Enrich contacts from a CSV file and save results.
         
+        The input is read and enriched chunk_size contacts at a time, and each
+        chunk is appended and flushed to the output CSV as soon as it is done, so
+        an interrupted run keeps every chunk that finished.
+        
         Args:
             input_file_path: Path to input CSV file
             output_file_path: Path to output CSV file
+            chunk_size: Number of contacts read and enriched at a time
             
         Returns:
             List of enriched ContactInfo objects
         """
         try:
             # Read contacts from CSV
-            contacts = self.read_contacts_csv(input_file_path)
+            contacts = self.iter_contacts_csv(input_file_path)
+            first = next(contacts, None)
             
-            if not contacts:
+            if first is None:
                 logger.warning("No contacts found in the input file")
                 return []
             
-            logger.info(f"Starting enrichment for {len(contacts)} contacts")
+            logger.info(f"Starting enrichment of contacts from {input_file_path}")
             
-            # Enrich contacts using the agent
-            enriched_contacts = self.contact_agent.process_contacts_batch(contacts)
+            enriched_contacts = []
+            with open(output_file_path, 'w', newline='', encoding='utf-8') as f:
+                writer = self._contact_writer(f)
+                
+                for chunk in self._chunks(chain([first], contacts), chunk_size):
+                    # Enrich contacts using the agent
+                    enriched = self.contact_agent.process_contacts_batch(chunk)
+                    writer.writerows(map(vars, enriched))
+                    enriched_contacts.extend(enriched)
+                    
+                    # Flush each chunk so finished contacts survive a failure later in the run
+                    f.flush()
             
-            # Save results to CSV
-            self.save_enriched_contacts_to_csv(enriched_contacts, output_file_path)
+            logger.info(f"Saved {len(enriched_contacts)} enriched contacts to {output_file_path}")
             
             # Also save to JSON for backup
-            json_output_path = output_file_path.replace('.csv', '.json')
+            json_output_path = str(Path(output_file_path).with_suffix('.json'))
             self.save_enriched_contacts_to_json(enriched_contacts, json_output_path)
             
             logger.info(f"Enrichment completed. Results saved to {output_file_path}")
@@ -99,6 +126,25 @@ class ContactCSVProcessor:
             logger.error(f"Error enriching contacts from CSV: {str(e)}")
             raise
     
+    @staticmethod
+    def _chunks(items: Iterable[Dict[str, str]], size: int) -> Iterator[List[Dict[str, str]]]:
+        """Yield successive lists of up to size items."""
+        items = iter(items)
+        while chunk := list(islice(items, max(1, size))):
+            yield chunk
+    
+    @staticmethod
+    def _contact_writer(f) -> csv.DictWriter:
+        """
+        Return a CSV writer for ContactInfo rows, with the header already written.
+        
+        Rows are written straight from each ContactInfo's attribute dict (vars), which
+        avoids the recursive copy dataclasses.asdict makes of every contact.
+        """
+        writer = csv.DictWriter(f, fieldnames=[field.name for field in fields(ContactInfo)])
+        writer.writeheader()
+        return writer
+    
     def save_enriched_contacts_to_csv(self, contacts: List[ContactInfo], file_path: str) -> None:
         """
         Save enriched contacts to a CSV file.
@@ -108,21 +154,8 @@ class ContactCSVProcessor:
             file_path: Path to save the CSV file
         """
         try:
-            # Convert ContactInfo objects to dictionaries
-            data = []
-            for contact in contacts:
-                data.append({
-                    "contact_name": contact.contact_name,
-                    "company_name": contact.company_name,
-                    "linkedin_url": contact.linkedin_url,
-                    "current_job_title": contact.current_job_title,
-                    "work_email": contact.work_email,
-                    "citation_source": contact.citation_source
-                })
-            
-            # Create DataFrame and save to CSV
-            df = pd.DataFrame(data)
-            df.to_csv(file_path, index=False)
+            with open(file_path, 'w', newline='', encoding='utf-8') as f:
+                self._contact_writer(f).writerows(map(vars, contacts))
             
             logger.info(f"Saved {len(contacts)} enriched contacts to {file_path}")
             
@@ -139,23 +172,9 @@ class ContactCSVProcessor:
             file_path: Path to save the JSON file
         """
         try:
-            import json
-            
-            # Convert ContactInfo objects to dictionaries
-            data = []
-            for contact in contacts:
-                data.append({
-                    "contact_name": contact.contact_name,
-                    "company_name": contact.company_name,
-                    "linkedin_url": contact.linkedin_url,
-                    "current_job_title": contact.current_job_title,
-                    "work_email": contact.work_email,
-                    "citation_source": contact.citation_source
-                })
-            
-            # Save to JSON file
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            # ContactInfo is a dataclass, which orjson serializes natively
+            with open(file_path, 'wb') as f:
+                f.write(orjson.dumps(contacts, option=orjson.OPT_INDENT_2))
             
             logger.info(f"Saved {len(contacts)} enriched contacts to {file_path}")
             
@@ -184,65 +203,58 @@ class ContactCSVProcessor:
         logger.info(f"Created sample contacts CSV at {file_path}")
 
 
-if __name__ == "__main__":
-    # Test the contact CSV processor
-    processor = ContactCSVProcessor()
-    
-    # Create a sample CSV file
-    sample_file = "sample_contacts.csv"
-    processor.create_sample_contacts_csv(sample_file)
-    
-    print(f"Created sample CSV file: {sample_file}")
-    print("You can now run the enrichment process on this file.")
-'''
-
-import pandas as pd
-from src.agents.contact_agent import ContactEnrichmentAgent
-
 class ExcelContactProcessor:
     def __init__(self, filepath):
         self.filepath = filepath
         self.agent = ContactEnrichmentAgent()
 
-    def process_contacts(self, input_sheet="Contacts", output_sheet="Contact Results"):
-        # read contacts data from the Contacts sheet
-        df = pd.read_excel(self.filepath, sheet_name=input_sheet)
+    @cached_property
+    def workbook(self):
+        # opened once and shared by every input sheet; result sheets are written separately
+        return pd.ExcelFile(self.filepath, engine="calamine")
 
-        results = []
-        for _, row in df.iterrows():
-            contact_name = str(row.get("Contact Name", "")).strip()
-            company_name = str(row.get("Company Name", "")).strip()
-            company_domain = str(row.get("Company Domain", "")).strip()
+    def process_contacts(self, input_sheet="Contacts", output_sheet="Contact Results", max_workers=10):
+        # read contacts data from the Contacts sheet
+        # only parse the columns used below, as plain strings
+        df = self.workbook.parse(input_sheet, usecols=lambda col: col in ("Contact Name", "Company Name"), dtype=str)
 
-            if not contact_name or not company_name:
-                continue
+        # normalize and filter whole columns at once; blank cells become "" rather than "nan"
+        blank = pd.Series("", index=df.index)
+        contact_names = df.get("Contact Name", blank).fillna("").str.strip()
+        company_names = df.get("Company Name", blank).fillna("").str.strip()
+        keep = (contact_names != "") & (company_names != "")
 
-            try:
-                enriched = self.agent.enrich_contact(contact_name, company_name)
+        contacts = list(zip(contact_names[keep], company_names[keep]))
 
-                results.append({
-                    "Contact Name": enriched.contact_name,
-                    "Company Name": enriched.company_name,
-                    "LinkedIn URL": enriched.linkedin_url,
-                    "Current Job Title": enriched.current_job_title,
-                    "Work Email": enriched.work_email,
-                    "Citation": enriched.citation_source,
-                })
-            except Exception as e:
-                results.append({
-                    "Contact Name": contact_name,
-                    "Company Name": company_name,
-                    "LinkedIn URL": "Error",
-                    "Current Job Title": "Error",
-                    "Work Email": "Error",
-                    "Citation": str(e),
-                })
+        # the agent extracts LinkedIn details for several contacts per LLM call and
+        # enriches those chunks concurrently; results come back in sheet order
+        enriched = self.agent.process_contacts_batch(
+            [{"contact_name": contact, "company_name": company} for contact, company in contacts],
+            max_workers=max_workers
+        )
 
-        results_df = pd.DataFrame(results)
+        # build the sheet column by column instead of from one dict per row
+        results_df = pd.DataFrame({
+            "Contact Name": [info.contact_name for info in enriched],
+            "Company Name": [info.company_name for info in enriched],
+            "LinkedIn URL": [info.linkedin_url for info in enriched],
+            "Current Job Title": [info.current_job_title for info in enriched],
+            "Work Email": [info.work_email for info in enriched],
+            "Citation": [info.citation_source for info in enriched],
+        })
 
         # write results into a new sheet
-        with pd.ExcelWriter(self.filepath, engine="openpyxl", mode="a", if_sheet_exists="replace") as writer:
-            results_df.to_excel(writer, sheet_name=output_sheet, index=False)
+        write_sheet(self.filepath, output_sheet, results_df)
 
         print(f"[INFO] Contact results written to sheet: {output_sheet}")
 
+if __name__ == "__main__":
+    # Test the contact CSV processor
+    processor = ContactCSVProcessor()
+    
+    # Create a sample CSV file
+    sample_file = "sample_contacts.csv"
+    processor.create_sample_contacts_csv(sample_file)
+    
+    print(f"Created sample CSV file: {sample_file}")
+    print("You can now run the enrichment process on this file.")
@@ -1,22 +1,67 @@
-'''
 import pandas as pd
 import csv
-import json
-from typing import List, Dict, Any, Optional
+import orjson
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
 from pathlib import Path
-import time
+from collections import Counter
+from functools import cached_property
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from tqdm import tqdm
 from src.agents.revenue_agent import DeepSeekRevenueAgent
-from src.tools.tier_assignment import analyze_company_tier
+from src.tools.tier_assignment import analyze_company_tier, assign_company_tiers
+from src.util.rate_limit import TokenBucket
+from src.util.excel import write_sheet
 
 
 class CompanyRevenueProcessor:
     """Processes CSV files containing company information and determines revenue/tiers."""
     
+    # Columns every input CSV must provide
+    REQUIRED_COLUMNS = ['Company Name', 'Company Region', 'Company Domain']
+    
+    # Columns written for every analysis result
+    RESULT_COLUMNS = [
+        "company_name",
+        "company_domain",
+        "company_region",
+        "estimated_revenue_usd",
+        "revenue_display",
+        "tier",
+        "tier_description",
+        "citation",
+    ]
+    
     def __init__(self):
         self.revenue_agent = DeepSeekRevenueAgent()
         self.processed_companies = []
         self.failed_companies = []
     
+    def peek_header(self, csv_path: str) -> List[str]:
+        """
+        Read only the header row of a CSV file.
+        
+        Args:
+            csv_path: Path to the CSV file
+            
+        Returns:
+            List of column names
+        """
+        with open(csv_path, newline='', encoding='utf-8-sig') as f:
+            return next(csv.reader(f), [])
+    
+    def iter_rows(self, csv_path: str) -> Iterator[Dict[str, str]]:
+        """
+        Lazily yield company rows from a CSV file without loading it into memory.
+        
+        Args:
+            csv_path: Path to the CSV file
+            
+        Yields:
+            Dictionaries containing company information
+        """
+        with open(csv_path, newline='', encoding='utf-8-sig') as f:
+            yield from csv.DictReader(f)
+    
     def load_csv(self, csv_path: str) -> List[Dict[str, str]]:
         """
         Load company data from CSV file.
@@ -28,17 +73,14 @@ class CompanyRevenueProcessor:
             List of dictionaries containing company information
         """
         try:
-            df = pd.read_csv(csv_path)
-            
             # Validate required columns
-            required_columns = ['Company Name', 'Company Region', 'Company Domain']
-            missing_columns = [col for col in required_columns if col not in df.columns]
+            header = self.peek_header(csv_path)
+            missing_columns = [col for col in self.REQUIRED_COLUMNS if col not in header]
             
             if missing_columns:
                 raise ValueError(f"Missing required columns: {missing_columns}")
             
-            # Convert to list of dictionaries
-            companies = df.to_dict('records')
+            companies = list(self.iter_rows(csv_path))
             
             print(f"Loaded {len(companies)} companies from {csv_path}")
             return companies
@@ -62,11 +104,6 @@ class CompanyRevenueProcessor:
         company_domain = company_data.get('Company Domain', '')
         company_region = company_data.get('Company Region', '')
         
-        print(f"\nProcessing: {company_name}")
-        print(f"Domain: {company_domain}")
-        print(f"Region: {company_region}")
-        print("-" * 50)
-        
         try:
             # Use revenue agent to analyze the company
             revenue_analysis = self.revenue_agent.analyze_company_revenue(
@@ -78,56 +115,226 @@ class CompanyRevenueProcessor:
             
             # Perform tier analysis
             tier_analysis = analyze_company_tier(revenue_analysis)
+            tier_analysis['company_region'] = company_region
             
-            print(f"✓ Revenue: {tier_analysis['revenue_display']}")
-            print(f"✓ Tier: {tier_analysis['tier']}")
-            print(f"✓ Citation: {tier_analysis['citation'][:100]}...")
+            tqdm.write(f"✓ {company_name}: {tier_analysis['revenue_display']} ({tier_analysis['tier']})")
             
             return tier_analysis
             
         except Exception as e:
-            error_result = {
-                "company_name": company_name,
-                "company_domain": company_domain,
-                "company_region": company_region,
-                "estimated_revenue_usd": None,
-                "revenue_display": "Error",
-                "tier": "Error",
-                "tier_description": f"Processing failed: {str(e)}",
-                "citation": f"Error: {str(e)}"
-            }
-            
-            print(f"✗ Error processing {company_name}: {str(e)}")
-            return error_result
+            tqdm.write(f"✗ Error processing {company_name}: {str(e)}")
+            return self._error_result(company_data, e)
     
-    def process_companies_batch(self, companies: List[Dict[str, str]], 
-                              delay_between_companies: float = 2.0) -> List[Dict[str, Any]]:
+    def _error_result(self, company_data: Dict[str, str], error: Exception) -> Dict[str, Any]:
+        """Build the result row for a company that could not be processed."""
+        return {
+            "company_name": company_data.get('Company Name', ''),
+            "company_domain": company_data.get('Company Domain', ''),
+            "company_region": company_data.get('Company Region', ''),
+            "estimated_revenue_usd": None,
+            "revenue_display": "Error",
+            "tier": "Error",
+            "tier_description": f"Processing failed: {str(error)}",
+            "citation": f"Error: {str(error)}"
+        }
+    
+    def process_company_chunk(self, chunk: List[Dict[str, str]]) -> List[Dict[str, Any]]:
         """
-        Process multiple companies with delays between requests.
+        Process several companies, extracting their revenue with one LLM call.
         
         Args:
-            companies: List of company data dictionaries
-            delay_between_companies: Delay in seconds between company processing
+            chunk: List of company data dictionaries
             
         Returns:
-            List of analysis results
+            List of analysis results, in the same order as ``chunk``
         """
+        pairs = [(c.get('Company Name', ''), c.get('Company Domain', '')) for c in chunk]
+        
+        try:
+            analyses = self.revenue_agent.analyze_companies_batch(pairs)
+        except Exception as e:
+            tqdm.write(f"✗ Error processing batch of {len(chunk)} companies: {str(e)}")
+            return [self._error_result(company_data, e) for company_data in chunk]
+        
         results = []
-        total_companies = len(companies)
+        for company_data, revenue_analysis in zip(chunk, analyses):
+            if revenue_analysis.get('status') == 'failed' and 'error' in revenue_analysis:
+                tqdm.write(f"✗ Error processing {company_data.get('Company Name', '')}: {revenue_analysis['error']}")
+                results.append(self._error_result(company_data, revenue_analysis['error']))
+                continue
+            
+            tier_analysis = analyze_company_tier(revenue_analysis)
+            tier_analysis['company_region'] = company_data.get('Company Region', '')
+            
+            tqdm.write(f"✓ {tier_analysis['company_name']}: {tier_analysis['revenue_display']} ({tier_analysis['tier']})")
+            results.append(tier_analysis)
+        
+        return results
+    
+    @staticmethod
+    def _dedupe_key(company_data: Dict[str, str]) -> Tuple[str, str]:
+        """Key identifying rows that describe the same company."""
+        return (
+            str(company_data.get('Company Name', '')).strip().lower(),
+            str(company_data.get('Company Domain', '')).strip().lower()
+        )
+    
+    def load_checkpoint(self, jsonl_path: str) -> List[Dict[str, Any]]:
+        """
+        Read the results an interrupted run already saved to its JSONL output.
         
-        print(f"\nStarting batch processing of {total_companies} companies...")
-        print("=" * 60)
+        A final line cut short by the interruption is removed from the file, so new
+        results can be appended after the complete ones.
         
-        for i, company_data in enumerate(companies, 1):
-            print(f"\n[{i}/{total_companies}] Processing company...")
+        Args:
+            jsonl_path: Path to the JSONL results file
             
-            result = self.process_single_company(company_data)
-            results.append(result)
+        Returns:
+            List of saved result dictionaries (empty if the file does not exist)
+        """
+        path = Path(jsonl_path)
+        if not path.exists():
+            return []
+        
+        with open(path, 'rb+') as f:
+            data = f.read()
+            complete = data[:data.rfind(b"\n") + 1]
+            if len(complete) != len(data):
+                f.truncate(len(complete))
+        
+        return [orjson.loads(line) for line in complete.splitlines() if line.strip()]
+    
+    def skip_completed(self, companies: Iterable[Dict[str, str]],
+                       completed: List[Dict[str, Any]]) -> Iterator[Dict[str, str]]:
+        """Yield the company rows that have no result in ``completed``."""
+        done = {
+            self._dedupe_key({'Company Name': result.get('company_name', ''),
+                              'Company Domain': result.get('company_domain', '')})
+            for result in completed
+        }
+        return (company_data for company_data in companies if self._dedupe_key(company_data) not in done)
+    
+    def iter_process_companies(self, companies: Iterable[Dict[str, str]],
+                               delay_between_companies: Optional[float] = None,
+                               max_workers: int = 4,
+                               batch_size: int = 10) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Process companies concurrently, yielding each result as soon as it completes.
+        
+        Each company is I/O-bound on the Brave Search and OpenRouter APIs, so up to
+        ``max_workers`` jobs run at once. Companies are grouped into chunks of
+        ``batch_size`` whose revenue is extracted with a single LLM call. Brave and
+        OpenRouter requests are rate limited by shared token buckets, so chunks
+        start as soon as a worker is free unless ``delay_between_companies`` sets
+        a stricter limit on chunk starts. Rows repeating the same company name and domain are
+        analyzed once and the result is reused for every duplicate row.
+        
+        Rows are consumed lazily: a chunk is submitted as soon as ``batch_size`` new
+        companies have arrived, and reading pauses while ``2 * max_workers`` chunks
+        are in flight, so the input rows are never held in memory all at once.
+        
+        Args:
+            companies: Company data dictionaries; any iterable, e.g. from iter_rows
+            delay_between_companies: Optional minimum delay in seconds between starting chunks
+            max_workers: Maximum number of chunks processed concurrently
+            batch_size: Number of companies per LLM call (1 disables batching)
             
-            # Add delay between companies to respect rate limits
-            if i < total_companies:
-                print(f"Waiting {delay_between_companies} seconds before next company...")
-                time.sleep(delay_between_companies)
+        Yields:
+            Tuples of (index into ``companies``, analysis result) in completion order
+        """
+        batch_size = max(1, batch_size)
+        max_workers = max(1, max_workers)
+        
+        tqdm.write("\nStarting batch processing...")
+        tqdm.write(f"Concurrency: {max_workers} worker(s), {batch_size} company(ies) per LLM call")
+        tqdm.write("=" * 60)
+        
+        start_limiter = None
+        if delay_between_companies:
+            start_limiter = TokenBucket(1.0 / delay_between_companies)
+        
+        def run(chunk: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+            if start_limiter is not None:
+                start_limiter.acquire()
+            
+            if len(chunk) == 1:
+                return [self.process_single_company(chunk[0])]
+            return self.process_company_chunk(chunk)
+        
+        # Rows waiting on a company's analysis, as (row index, region of a duplicate row or
+        # None for the first row); once analyzed, the result is kept for later duplicates
+        waiting: Dict[Tuple[str, str], List[Tuple[int, Optional[str]]]] = {}
+        finished: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        futures: Dict[Future, List[Tuple[str, str]]] = {}
+        duplicates = 0
+        
+        def drain(block: bool) -> Iterator[Tuple[int, Dict[str, Any]]]:
+            if block:
+                done = wait(futures, return_when=FIRST_COMPLETED).done
+            else:
+                done = [future for future in futures if future.done()]
+            
+            for future in done:
+                for key, result in zip(futures.pop(future), future.result()):
+                    finished[key] = result
+                    for row, region in waiting.pop(key):
+                        # Duplicate rows share the analysis but keep their own region
+                        yield row, result if region is None else {**result, 'company_region': region}
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            chunk_keys: List[Tuple[str, str]] = []
+            chunk: List[Dict[str, str]] = []
+            
+            for i, company_data in enumerate(companies):
+                key = self._dedupe_key(company_data)
+                if key in finished:
+                    duplicates += 1
+                    yield i, {**finished[key], 'company_region': company_data.get('Company Region', '')}
+                    continue
+                if key in waiting:
+                    duplicates += 1
+                    waiting[key].append((i, company_data.get('Company Region', '')))
+                    continue
+                
+                waiting[key] = [(i, None)]
+                chunk_keys.append(key)
+                chunk.append(company_data)
+                if len(chunk) < batch_size:
+                    continue
+                
+                futures[executor.submit(run, chunk)] = chunk_keys
+                chunk_keys, chunk = [], []
+                yield from drain(block=len(futures) >= 2 * max_workers)
+            
+            if chunk:
+                futures[executor.submit(run, chunk)] = chunk_keys
+            while futures:
+                yield from drain(block=True)
+        
+        if duplicates:
+            tqdm.write(f"Deduplicated {duplicates} repeated company row(s)")
+    
+    def process_companies_batch(self, companies: List[Dict[str, str]], 
+                              delay_between_companies: Optional[float] = None,
+                              max_workers: int = 4,
+                              batch_size: int = 10) -> List[Dict[str, Any]]:
+        """
+        Process multiple companies concurrently within the API rate limits.
+        
+        Args:
+            companies: List of company data dictionaries
+            delay_between_companies: Optional minimum delay in seconds between starting chunks
+            max_workers: Maximum number of chunks processed concurrently
+            batch_size: Number of companies per LLM call (1 disables batching)
+            
+        Returns:
+            List of analysis results, in the same order as ``companies``
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(companies)
+        
+        for i, result in self.iter_process_companies(companies, delay_between_companies,
+                                                     max_workers, batch_size):
+            results[i] = result
         
         return results
     
@@ -139,16 +346,19 @@ class CompanyRevenueProcessor:
             results: List of analysis results
             output_path: Base path for output files (without extension)
         """
-        # Save as CSV
+        # Save as CSV, with the same columns as the streaming CLI output; building a
+        # DataFrame just to write it would copy every result first
         csv_path = f"{output_path}.csv"
-        df = pd.DataFrame(results)
-        df.to_csv(csv_path, index=False)
+        with open(csv_path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=self.RESULT_COLUMNS, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(results)
         print(f"\nResults saved to CSV: {csv_path}")
         
         # Save as JSON for detailed analysis
         json_path = f"{output_path}.json"
-        with open(json_path, 'w') as f:
-            json.dump(results, f, indent=2)
+        with open(json_path, 'wb') as f:
+            f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
         print(f"Detailed results saved to JSON: {json_path}")
         
         # Save summary statistics
@@ -160,28 +370,38 @@ class CompanyRevenueProcessor:
         """Save a summary of the analysis results."""
         total_companies = len(results)
         
-        # Count by tier
-        tier_counts = {}
+        # Count by tier and revenue availability in a single pass
+        tier_counts = Counter()
         revenue_found = 0
         
         for result in results:
-            tier = result.get('tier', 'Unknown')
-            tier_counts[tier] = tier_counts.get(tier, 0) + 1
-            
-            if result.get('estimated_revenue_usd') is not None:
-                revenue_found += 1
+            tier_counts[result.get('tier', 'Unknown')] += 1
+            revenue_found += result.get('estimated_revenue_usd') is not None
+        
+        self.write_summary(summary_path, total_companies, revenue_found, tier_counts)
+    
+    def write_summary(self, summary_path: str, total_companies: int, revenue_found: int,
+                      tier_counts: Dict[str, int]):
+        """
+        Write a summary file from precomputed result counts.
         
+        Args:
+            summary_path: Path of the summary text file
+            total_companies: Number of companies processed
+            revenue_found: Number of companies with revenue data
+            tier_counts: Number of companies per tier
+        """
         with open(summary_path, 'w') as f:
             f.write("COMPANY REVENUE ANALYSIS SUMMARY\n")
             f.write("=" * 50 + "\n\n")
             f.write(f"Total Companies Processed: {total_companies}\n")
             f.write(f"Companies with Revenue Data: {revenue_found}\n")
-            f.write(f"Success Rate: {(revenue_found/total_companies)*100:.1f}%\n\n")
+            f.write(f"Success Rate: {(revenue_found/total_companies)*100 if total_companies else 0.0:.1f}%\n\n")
             
             f.write("TIER DISTRIBUTION:\n")
             f.write("-" * 20 + "\n")
             for tier, count in sorted(tier_counts.items()):
-                percentage = (count/total_companies)*100
+                percentage = (count/total_companies)*100 if total_companies else 0.0
                 f.write(f"{tier}: {count} companies ({percentage:.1f}%)\n")
             
             f.write("\nTIER DEFINITIONS:\n")
@@ -193,14 +413,14 @@ class CompanyRevenueProcessor:
             f.write("Unknown/Error: Revenue information not available\n")
     
     def process_csv_file(self, input_csv_path: str, output_base_path: str = None,
-                        delay_between_companies: float = 2.0) -> List[Dict[str, Any]]:
+                        delay_between_companies: Optional[float] = None) -> List[Dict[str, Any]]:
         """
         Complete pipeline to process a CSV file.
         
         Args:
             input_csv_path: Path to input CSV file
             output_base_path: Base path for output files (defaults to input name)
-            delay_between_companies: Delay between company processing
+            delay_between_companies: Optional minimum delay between starting chunks
             
         Returns:
             List of analysis results
@@ -222,6 +442,63 @@ class CompanyRevenueProcessor:
         return results
 
 
+class ExcelCompanyProcessor:
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.agent = DeepSeekRevenueAgent()
+
+    @cached_property
+    def workbook(self):
+        # opened once and shared by every input sheet; result sheets are written separately
+        return pd.ExcelFile(self.filepath, engine="calamine")
+
+    def process_companies(self, input_sheet="Companies", output_sheet="Company Results", max_workers=10):
+        # read company data from the Companies sheet
+        # only parse the columns used below, as plain strings
+        df = self.workbook.parse(input_sheet, usecols=lambda col: col in ("Company Name", "Company Domain"), dtype=str)
+
+        # normalize and filter whole columns at once; blank cells become "" rather than "nan"
+        blank = pd.Series("", index=df.index)
+        company_names = df.get("Company Name", blank).fillna("").str.strip()
+        company_domains = df.get("Company Domain", blank).fillna("").str.strip()
+        keep = company_names != ""
+
+        companies = list(zip(company_names[keep], company_domains[keep]))
+
+        # each analysis waits on search and LLM round-trips, so run them concurrently;
+        # map keeps the results in sheet order
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            analyses = list(executor.map(lambda c: self._analyze_row(*c), companies))
+
+        # tier the whole revenue column in one pass; rows whose analysis failed are marked Error
+        revenues = [revenue for revenue, _, _ in analyses]
+        tiers = [tier if not failed else "Error"
+                 for tier, (_, _, failed) in zip(assign_company_tiers(revenues), analyses)]
+
+        # build the sheet column by column instead of from one dict per row
+        results_df = pd.DataFrame({
+            "Company Name": [name for name, _ in companies],
+            "Company Domain": [domain for _, domain in companies],
+            "Estimated Revenue (USD)": revenues,
+            "Tier": tiers,
+            "Citation": [citation for _, citation, _ in analyses],
+        })
+
+        # write results into a new sheet
+        write_sheet(self.filepath, output_sheet, results_df)
+
+        print(f"[INFO] Company results written to sheet: {output_sheet}")
+
+    def _analyze_row(self, company_name, company_domain):
+        """Return (revenue, citation, failed) for one sheet row."""
+        try:
+            # get revenue from agent
+            result = self.agent.analyze_company_revenue(company_name, company_domain)
+            return result.get("estimated_revenue_usd", 0.0), result.get("citation", ""), False
+        except Exception as e:
+            return None, str(e), True
+
+
 if __name__ == "__main__":
     # Example usage
     processor = CompanyRevenueProcessor()
@@ -248,56 +525,3 @@ if __name__ == "__main__":
     print("Created sample CSV file for testing")
     print("To process your own CSV file, use:")
     print("processor.process_csv_file('your_file.csv')")
-'''
-
-import pandas as pd
-from src.agents.revenue_agent import DeepSeekRevenueAgent
-from src.tools.tier_assignment import assign_company_tier
-
-class ExcelCompanyProcessor:
-    def __init__(self, filepath):
-        self.filepath = filepath
-        self.agent = DeepSeekRevenueAgent()
-
-    def process_companies(self, input_sheet="Companies", output_sheet="Company Results"):
-        # read company data from the Companies sheet
-        df = pd.read_excel(self.filepath, sheet_name=input_sheet)
-
-        results = []
-        for _, row in df.iterrows():
-            company_name = str(row.get("Company Name", "")).strip()
-            company_domain = str(row.get("Company Domain", "")).strip()
-
-            if not company_name:
-                continue
-
-            try:
-                # get revenue from agent
-                result = self.agent.analyze_company_revenue(company_name, company_domain)
-                revenue = result.get("estimated_revenue_usd", 0.0)
-                tier = assign_company_tier(revenue)
-
-                results.append({
-                    "Company Name": company_name,
-                    "Company Domain": company_domain,
-                    "Estimated Revenue (USD)": revenue,
-                    "Tier": tier,
-                    "Citation": result.get("citation", ""),
-                })
-            except Exception as e:
-                results.append({
-                    "Company Name": company_name,
-                    "Company Domain": company_domain,
-                    "Estimated Revenue (USD)": None,
-                    "Tier": "Error",
-                    "Citation": str(e),
-                })
-
-        results_df = pd.DataFrame(results)
-
-        # write results into a new sheet
-        with pd.ExcelWriter(self.filepath, engine="openpyxl", mode="a", if_sheet_exists="replace") as writer:
-            results_df.to_excel(writer, sheet_name=output_sheet, index=False)
-
-        print(f"[INFO] Company results written to sheet: {output_sheet}")
-
@@ -1,7 +1,12 @@
 import pandas as pd
-import json
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from itertools import chain
 from src.agents.revenue_agent import DeepSeekRevenueAgent
-from src.agents.contact_agent import run_contact_agent
+from src.agents.contact_agent import run_contact_agent_batch
+from src.tools.tier_assignment import assign_company_tiers
+from src.util.excel import write_sheet, write_sheets
 
 
 class ExcelCompanyProcessor:
@@ -9,94 +14,145 @@ class ExcelCompanyProcessor:
         self.excel_file = excel_file
         self.agent = DeepSeekRevenueAgent()
 
+    @cached_property
+    def workbook(self):
+        # Opened once and shared by every input sheet; result sheets are written separately
+        return pd.ExcelFile(self.excel_file, engine="calamine")
+
+    @staticmethod
+    def _save_json(path, results_df):
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(results_df.to_dict("records"),
+                                 option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+
     # -----------------------------
     # PART A - Companies
     # -----------------------------
-    def process_companies(self, input_sheet="Companies", output_sheet="Company Results"):
-        df = pd.read_excel(self.excel_file, sheet_name=input_sheet)
-        results = []
-
-        for _, row in df.iterrows():
-            company_name = row.get("Company Name", "")
-            company_domain = row.get("Company Domain", "")
-
-            analysis = self.agent.analyze_company_revenue(company_name, company_domain)
-
-            # Assign tier (static logic)
-            revenue = analysis["estimated_revenue_usd"]
-            if revenue is None:
-                tier = "Unknown"
-            elif revenue > 1_000_000_000:
-                tier = "Super Platinum"
-            elif revenue >= 500_000_000:
-                tier = "Platinum"
-            elif revenue >= 100_000_000:
-                tier = "Diamond"
-            else:
-                tier = "Gold"
-
-            results.append({
-                "Company Name": company_name,
-                "Company Domain": company_domain,
-                "Estimated Revenue (USD)": revenue,
-                "Tier": tier,
-                "Citation": analysis["citation"]
-            })
+    def process_companies(self, input_sheet="Companies", output_sheet="Company Results", batch_size=10, max_workers=4):
+        results_df = self._company_results(self._read_companies(input_sheet), batch_size, max_workers)
 
         # Write to Excel
-        results_df = pd.DataFrame(results)
-        with pd.ExcelWriter(self.excel_file, mode="a", if_sheet_exists="replace") as writer:
-            results_df.to_excel(writer, sheet_name=output_sheet, index=False)
+        write_sheet(self.excel_file, output_sheet, results_df)
 
         # ✅ Also save to JSON
-        with open("company_results.json", "w") as f:
-            json.dump(results, f, indent=4)
+        self._save_json("company_results.json", results_df)
 
         print(f"✅ Companies processed. Results saved to Excel ({output_sheet}) and company_results.json")
 
+    def _read_companies(self, input_sheet):
+        # Only parse the columns used below, as plain strings; blank cells read as ""
+        return self.workbook.parse(input_sheet, usecols=lambda col: col in ("Company Name", "Company Domain"),
+                                   dtype=str, keep_default_na=False)
+
+    def _company_results(self, df, batch_size, max_workers):
+        blank = pd.Series("", index=df.index)
+        companies = list(zip(df.get("Company Name", blank), df.get("Company Domain", blank)))
+
+        # Repeated rows for the same company share one analysis
+        unique = list(dict.fromkeys(companies))
+
+        # This is an offline report, so pool companies into one revenue extraction call per batch;
+        # batches run concurrently and stay within the shared Brave and OpenRouter rate limits
+        step = max(1, batch_size)
+        batches = [unique[i:i + step] for i in range(0, len(unique), step)]
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            analyses = list(chain.from_iterable(executor.map(self.agent.analyze_companies_batch, batches)))
+        analysis_by_company = dict(zip(unique, analyses))
+        row_analyses = [analysis_by_company[company] for company in companies]
+
+        # Assign every tier in one pass
+        revenues = [analysis["estimated_revenue_usd"] for analysis in row_analyses]
+        tiers = assign_company_tiers(revenues)
+
+        return pd.DataFrame({
+            "Company Name": df.get("Company Name", blank),
+            "Company Domain": df.get("Company Domain", blank),
+            # object dtype keeps whole-dollar ints from being widened to float alongside None
+            "Estimated Revenue (USD)": pd.Series(revenues, index=df.index, dtype=object),
+            "Tier": tiers,
+            "Citation": [analysis["citation"] for analysis in row_analyses]
+        })
+
     # -----------------------------
     # PART B - Contacts
     # -----------------------------
-    def process_contacts(self, input_sheet="Contacts", output_sheet="Contact Results"):
-        df = pd.read_excel(self.excel_file, sheet_name=input_sheet)
-        results = []
-
-        for _, row in df.iterrows():
-            contact_name = row["Full Name"]
-            company_name = row["Current Company"]
-            company_domain = row.get("Company Domain", "")
-
-            # Call contact agent
-            linkedin_url, job_title, email, citation = run_contact_agent(contact_name, company_name, company_domain)
-
-            # Fallbacks in case agent doesn’t return
-            if not linkedin_url:
-                linkedin_url = f"https://www.linkedin.com/in/{contact_name.lower().replace(' ', '')}"
-            if not job_title:
-                job_title = "Unknown (needs contact agent)"
-            if not email and company_domain:
-                first, last = contact_name.split(" ")[0], contact_name.split(" ")[-1]
-                email = f"{first.lower()}.{last.lower()}@{company_domain}"
-
-            results.append({
-                "Contact Name": contact_name,
-                "Company Name": company_name,
-                "LinkedIn URL": linkedin_url,
-                "Current Job Title": job_title,
-                "Work Email": email,
-                "Citation": citation
-            })
+    def process_contacts(self, input_sheet="Contacts", output_sheet="Contact Results", max_workers=10):
+        results_df = self._contact_results(self._read_contacts(input_sheet), max_workers)
 
         # Write to Excel
-        results_df = pd.DataFrame(results)
-        with pd.ExcelWriter(self.excel_file, engine="openpyxl", mode="a", if_sheet_exists="replace") as writer:
-            results_df.to_excel(writer, sheet_name=output_sheet, index=False)
+        write_sheet(self.excel_file, output_sheet, results_df)
 
         # ✅ Also save to JSON
-        with open("contact_results.json", "w") as f:
-            json.dump(results, f, indent=4)
+        self._save_json("contact_results.json", results_df)
 
         print(f"✅ Contacts processed. Results saved to Excel ({output_sheet}) and contact_results.json")
 
+    def _read_contacts(self, input_sheet):
+        # Only parse the columns used below, as plain strings; blank cells read as ""
+        return self.workbook.parse(input_sheet,
+                                   usecols=lambda col: col in ("Full Name", "Current Company", "Company Domain"),
+                                   dtype=str, keep_default_na=False)
+
+    def _contact_results(self, df, max_workers):
+        contact_names = df["Full Name"]
+        company_domains = df.get("Company Domain", pd.Series("", index=df.index))
+
+        # Call contact agent; LinkedIn details are extracted for several contacts per LLM call
+        enriched = run_contact_agent_batch(list(zip(contact_names, df["Current Company"])), max_workers=max_workers)
+        agent_df = pd.DataFrame(enriched, index=df.index,
+                                columns=["LinkedIn URL", "Current Job Title", "Work Email", "Citation"])
+
+        # Fallbacks in case agent doesn’t return, computed for the whole sheet at once
+        lowered_names = contact_names.str.lower()
+        name_parts = lowered_names.str.split(" ")
+
+        linkedin_urls = agent_df["LinkedIn URL"].fillna("")
+        linkedin_urls = linkedin_urls.mask(
+            linkedin_urls == "", "https://www.linkedin.com/in/" + lowered_names.str.replace(" ", "", regex=False)
+        )
+        job_titles = agent_df["Current Job Title"].fillna("")
+        job_titles = job_titles.mask(job_titles == "", "Unknown (needs contact agent)")
+        emails = agent_df["Work Email"]
+        emails = emails.mask(
+            (emails.fillna("") == "") & (company_domains != ""),
+            name_parts.str[0] + "." + name_parts.str[-1] + "@" + company_domains
+        )
+
+        return pd.DataFrame({
+            "Contact Name": contact_names,
+            "Company Name": df["Current Company"],
+            "LinkedIn URL": linkedin_urls,
+            "Current Job Title": job_titles,
+            "Work Email": emails,
+            "Citation": agent_df["Citation"]
+        })
 
+    # -----------------------------
+    # PART A + B together
+    # -----------------------------
+    def process_all(self, company_sheet="Companies", contact_sheet="Contacts",
+                    company_output_sheet="Company Results", contact_output_sheet="Contact Results",
+                    batch_size=10, company_workers=4, contact_workers=10):
+        # Both sheets are parsed up front; only the network-bound passes run side by side
+        companies_df = self._read_companies(company_sheet)
+        contacts_df = self._read_contacts(contact_sheet)
+
+        # Revenue analysis and contact enrichment share no state, so their API calls overlap
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            company_future = executor.submit(self._company_results, companies_df, batch_size, company_workers)
+            contact_future = executor.submit(self._contact_results, contacts_df, contact_workers)
+            company_results_df = company_future.result()
+            contact_results_df = contact_future.result()
+
+        # Write both result sheets with a single workbook load and save
+        write_sheets(self.excel_file, {
+            company_output_sheet: company_results_df,
+            contact_output_sheet: contact_results_df
+        })
+
+        # ✅ Also save to JSON
+        self._save_json("company_results.json", company_results_df)
+        self._save_json("contact_results.json", contact_results_df)
 
+        print(f"✅ Companies and contacts processed. Results saved to Excel ({company_output_sheet}, "
+              f"{contact_output_sheet}), company_results.json and contact_results.json")
@@ -1,4 +1,17 @@
-from typing import Optional, Dict, Any
+import numpy as np
+from typing import Optional, Dict, Any, Iterable, List
+
+# Lower revenue bound of every tier above Gold, matching assign_company_tier
+_TIER_BOUNDS = np.array([100_000_000, 500_000_000, 1_000_000_000], dtype=np.float64)
+_TIER_LABELS = np.array(["Gold", "Diamond", "Platinum", "Super Platinum"], dtype=object)
+
+_TIER_DESCRIPTIONS = {
+    "Super Platinum": "Annual revenue from operations > $1Bn",
+    "Platinum": "Annual revenue from operations $500Mn to $1Bn",
+    "Diamond": "Annual revenue from operations $100Mn to $500Mn",
+    "Gold": "Annual revenue from operations below $100Mn",
+    "Unknown": "Revenue information not available"
+}
 
 
 def assign_company_tier(revenue_usd: Optional[float]) -> str:
@@ -25,6 +38,25 @@ def assign_company_tier(revenue_usd: Optional[float]) -> str:
         return "Gold"
 
 
+def assign_company_tiers(revenues: Iterable[Optional[float]]) -> List[str]:
+    """
+    Assign tiers to a whole column of revenues at once.
+    
+    Equivalent to calling assign_company_tier on each value, but every tier is
+    looked up with one binary search over the bounds.
+    
+    Args:
+        revenues: Annual revenues from operations in USD; None if unknown
+        
+    Returns:
+        List of tier assignment strings, in the same order as ``revenues``
+    """
+    values = np.array(list(revenues), dtype=np.float64)  # None becomes NaN
+    tiers = _TIER_LABELS[np.searchsorted(_TIER_BOUNDS, values, side="right")]
+    tiers[np.isnan(values)] = "Unknown"
+    return tiers.tolist()
+
+
 def format_revenue_display(revenue_usd: Optional[float]) -> str:
     """
     Format revenue for display purposes.
@@ -58,15 +90,7 @@ def get_tier_description(tier: str) -> str:
     Returns:
         Description of the tier
     """
-    descriptions = {
-        "Super Platinum": "Annual revenue from operations > $1Bn",
-        "Platinum": "Annual revenue from operations $500Mn to $1Bn",
-        "Diamond": "Annual revenue from operations $100Mn to $500Mn",
-        "Gold": "Annual revenue from operations below $100Mn",
-        "Unknown": "Revenue information not available"
-    }
-    
-    return descriptions.get(tier, "Unknown tier")
+    return _TIER_DESCRIPTIONS.get(tier, "Unknown tier")
 
 
 def analyze_company_tier(company_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -1,13 +1,54 @@
+import re
 import requests
-import json
-import time
+import orjson
 import logging
 from typing import Dict, List, Optional
+from urllib.parse import urlparse
 from src.config.settings import Config
+from src.util.http import create_session
+from src.util.rate_limit import TokenBucket
+from src.cache.search_cache import get_or_fetch
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Shared across all calls so TCP/TLS connections are reused; sized for the contact
+# agent's nested pools (10 chunks x 4 lookups) so no connection is discarded
+_session = create_session(pool_maxsize=64)
+
+# Shared by every search so concurrent workers stay within the plan's rate
+_rate_limiter = TokenBucket(Config.BRAVE_RPS, capacity=max(1.0, Config.BRAVE_RPS))
+
+
+# Company data sites searched before a generic query, most trusted first
+_PROFESSIONAL_SITES = (
+    "rocketreach.co",
+    "apollo.io",
+    "hunter.io",
+    "zoominfo.com",
+    "clearbit.com",
+    "crunchbase.com"
+)
+
+# Keywords marking a result as a likely financial report, matched in one scan
+_FINANCIAL_KEYWORDS_RE = re.compile(
+    "|".join(map(re.escape, [
+        "annual report", "quarterly report", "earnings", "financial results",
+        "sec filing", "10-k", "10-q", "revenue", "income statement",
+        "financial statement", "investor relations", "ir.", "investor"
+    ])),
+    re.IGNORECASE
+)
+
+
+def _professional_site_priority(url: str) -> Optional[int]:
+    """Return the index of the professional site a URL belongs to, or None."""
+    netloc = urlparse(url).netloc.lower()
+    for priority, site in enumerate(_PROFESSIONAL_SITES):
+        if netloc == site or netloc.endswith("." + site):
+            return priority
+    return None
+
 
 class BraveWebSearch:
     """Web search tool using Brave Search API."""
@@ -39,9 +80,22 @@ class BraveWebSearch:
                 "web": {"results": []}
             }
         
+        # Without a key Brave can only answer 401, so skip the round-trip
+        if not self.api_key:
+            logger.error("BRAVE_API_KEY is not set; skipping search")
+            return {
+                "error": "Unauthorized access to search API. Check API key.",
+                "web": {"results": []}
+            }
+        
         if count is None:
             count = Config.BRAVE_SEARCH_COUNT
             
+        # Identical queries are served from the on-disk cache across runs
+        return get_or_fetch(f"{query}::count={count}", lambda: self._fetch(query, count))
+    
+    def _fetch(self, query: str, count: int) -> Dict:
+        """Call the Brave Search API, returning an error dictionary on failure."""
         logger.info(f"Performing search for query: {query[:100]}...")
         
         params = {
@@ -53,7 +107,8 @@ class BraveWebSearch:
         }
         
         try:
-            response = requests.get(
+            _rate_limiter.acquire()
+            response = _session.get(
                 self.base_url,
                 headers=self.headers,
                 params=params,
@@ -77,10 +132,7 @@ class BraveWebSearch:
             
             response.raise_for_status()
             
-            # Wait 1 second after each search call for rate limiting
-            time.sleep(1)
-            
-            result = response.json()
+            result = orjson.loads(response.content)
             logger.info(f"Search completed successfully, found {len(result.get('web', {}).get('results', []))} results")
             return result
             
@@ -102,7 +154,7 @@ class BraveWebSearch:
                 "error": f"Search request failed: {str(e)}",
                 "web": {"results": []}
             }
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Failed to parse search response: {str(e)}")
             return {
                 "error": f"Failed to parse search response: {str(e)}",
@@ -141,6 +193,9 @@ class BraveWebSearch:
         """
         Search professional sites like RocketReach, Apollo.io, Hunter.io for company data.
         
+        All sites are searched with a single OR'd site: query rather than one query
+        per site, and results are ordered by the sites' priority.
+        
         Args:
             company_name: Name of the company
             company_domain: Optional company domain
@@ -148,62 +203,49 @@ class BraveWebSearch:
         Returns:
             List of search results from professional sites
         """
-        professional_sites = [
-            "site:rocketreach.co",
-            "site:apollo.io", 
-            "site:hunter.io",
-            "site:zoominfo.com",
-            "site:clearbit.com",
-            "site:crunchbase.com"
+        site_filter = " OR ".join(f"site:{site}" for site in _PROFESSIONAL_SITES)
+        query_parts = [
+            f"({site_filter})",
+            f'"{company_name}"',
+            "revenue",
+            "financial",
+            "company data"
         ]
         
-        all_results = []
+        if company_domain:
+            query_parts.append(f'({company_domain})')
         
-        for site_filter in professional_sites:
-            # Construct site-specific query
-            query_parts = [
-                site_filter,
-                f'"{company_name}"',
-                "revenue",
-                "financial",
-                "company data"
-            ]
-            
-            if company_domain:
-                query_parts.append(f'({company_domain})')
-            
-            query = " ".join(query_parts)
-            logger.info(f"Searching professional site with query: {query}")
-            
-            results = self.search(query, count=10)
-            
-            if "error" in results:
-                logger.warning(f"Search error for {site_filter}: {results['error']}")
-                continue
-            
-            web_results = results.get("web", {}).get("results", [])
-            
-            # Process results from this professional site
-            for result in web_results:
-                try:
-                    all_results.append({
-                        "title": result.get("title", ""),
-                        "url": result.get("url", ""),
-                        "description": result.get("description", ""),
-                        "published_date": result.get("published_date", ""),
-                        "age": result.get("age", ""),
-                        "source_type": "professional_site"
-                    })
-                except Exception as e:
-                    logger.warning(f"Error processing professional site result: {str(e)}")
+        query = " ".join(query_parts)
+        logger.info(f"Searching professional sites with query: {query}")
+        
+        results = self.search(query, count=20)
+        
+        if "error" in results:
+            logger.warning(f"Professional site search error for {company_name}: {results['error']}")
+            return []
+        
+        all_results = []
+        for result in results.get("web", {}).get("results", []):
+            try:
+                priority = _professional_site_priority(result.get("url", ""))
+                if priority is None:
                     continue
-            
-            # If we found results from this site, we can break early
-            if web_results:
-                logger.info(f"Found {len(web_results)} results from {site_filter}")
-                break
+                
+                all_results.append((priority, {
+                    "title": result.get("title", ""),
+                    "url": result.get("url", ""),
+                    "description": result.get("description", ""),
+                    "published_date": result.get("published_date", ""),
+                    "age": result.get("age", ""),
+                    "source_type": "professional_site"
+                }))
+            except Exception as e:
+                logger.warning(f"Error processing professional site result: {str(e)}")
+                continue
         
-        return all_results[:10]  # Return top 10 professional site results
+        # Stable sort keeps Brave's ranking within each site
+        all_results.sort(key=lambda item: item[0])
+        return [result for _, result in all_results[:10]]  # Return top 10 professional site results
     
     def _search_generic_revenue(self, company_name: str, company_domain: str = None) -> List[Dict]:
         """
@@ -276,19 +318,9 @@ class BraveWebSearch:
         # Filter for likely revenue sources
         revenue_sources = []
         for result in results:
-            url = result.get("url", "").lower()
-            title = result.get("title", "").lower()
-            description = result.get("description", "").lower()
-            
             # Look for financial reports, earnings, SEC filings, etc.
-            financial_keywords = [
-                "annual report", "quarterly report", "earnings", "financial results",
-                "sec filing", "10-k", "10-q", "revenue", "income statement",
-                "financial statement", "investor relations", "ir.", "investor"
-            ]
-            
-            if any(keyword in url or keyword in title or keyword in description 
-                   for keyword in financial_keywords):
+            text = f"{result.get('url', '')} {result.get('title', '')} {result.get('description', '')}"
+            if _FINANCIAL_KEYWORDS_RE.search(text):
                 revenue_sources.append(result.get("url", ""))
         
         return revenue_sources[:5]  # Return top 5 most relevant sources
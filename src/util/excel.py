@@ -0,0 +1,43 @@
+from typing import Dict
+import pandas as pd
+from openpyxl import load_workbook
+
+
+def write_sheet(path: str, sheet_name: str, df: pd.DataFrame) -> None:
+    """
+    Replace one sheet of an existing workbook with the rows of a DataFrame.
+
+    Rows are appended to the openpyxl worksheet directly instead of going through
+    DataFrame.to_excel, which formats every cell individually. A sheet that already
+    exists keeps its position; missing values are written as empty cells.
+
+    Args:
+        path: Path to the .xlsx workbook
+        sheet_name: Name of the sheet to create or replace
+        df: Rows to write, with the columns as the header row
+    """
+    write_sheets(path, {sheet_name: df})
+
+
+def write_sheets(path: str, sheets: Dict[str, pd.DataFrame]) -> None:
+    """
+    Replace several sheets of an existing workbook, loading and saving it once.
+
+    Args:
+        path: Path to the .xlsx workbook
+        sheets: DataFrame to write for each sheet name, as in write_sheet
+    """
+    workbook = load_workbook(path)
+
+    for sheet_name, df in sheets.items():
+        index = None
+        if sheet_name in workbook.sheetnames:
+            index = workbook.sheetnames.index(sheet_name)
+            del workbook[sheet_name]
+        worksheet = workbook.create_sheet(sheet_name, index)
+
+        worksheet.append(list(df.columns))
+        for row in df.astype(object).where(df.notna(), None).itertuples(index=False, name=None):
+            worksheet.append(row)
+
+    workbook.save(path)
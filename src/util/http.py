@@ -0,0 +1,33 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+def create_session(pool_maxsize: int = 32, retries: int = 3) -> requests.Session:
+    """
+    Create a requests session that keeps connections alive between API calls.
+    
+    Connection errors and gateway failures are retried with backoff at the transport
+    level. Non-idempotent requests are only retried when the connection could not
+    be established, and the final response is always returned to the caller so the
+    existing status-code handling still applies.
+    
+    Args:
+        pool_maxsize: Maximum number of pooled connections per host
+        retries: Transport-level retries; 0 for callers that retry themselves
+        
+    Returns:
+        Configured requests.Session
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=0.5,
+        status_forcelist=[500, 502, 503, 504],
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=pool_maxsize, max_retries=retry)
+    
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
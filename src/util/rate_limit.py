@@ -0,0 +1,92 @@
+import asyncio
+import threading
+import time
+from functools import lru_cache
+from typing import Optional
+from langchain_core.rate_limiters import BaseRateLimiter
+from src.config.settings import Config
+
+
+class TokenBucket:
+    """Thread-safe token bucket rate limiter.
+    
+    Tokens refill continuously at rate_per_sec up to capacity. acquire() returns
+    immediately while tokens are available and otherwise sleeps just long enough
+    for the request to fit within the rate, so bursts are bounded by capacity
+    without adding a fixed delay to every call.
+    """
+    
+    def __init__(self, rate_per_sec: float, capacity: float = 1.0):
+        if rate_per_sec <= 0:
+            raise ValueError("rate_per_sec must be positive")
+        
+        self.rate_per_sec = rate_per_sec
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _refill(self) -> None:
+        """Add the tokens accrued since the last update. Caller must hold the lock."""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate_per_sec)
+        self._updated = now
+    
+    def try_acquire(self, n: float = 1.0) -> bool:
+        """Consume n tokens if they are available right now, without waiting."""
+        with self._lock:
+            self._refill()
+            if self._tokens < n:
+                return False
+            self._tokens -= n
+            return True
+    
+    def acquire(self, n: float = 1.0) -> None:
+        """Block until n tokens are available, then consume them."""
+        with self._lock:
+            self._refill()
+            
+            # Reserve the tokens now so concurrent callers queue up behind us
+            self._tokens -= n
+            wait = -self._tokens / self.rate_per_sec if self._tokens < 0 else 0.0
+        
+        if wait > 0:
+            time.sleep(wait)
+
+
+class TokenBucketRateLimiter(BaseRateLimiter):
+    """Adapter that lets LangChain chat models draw from a shared TokenBucket.
+    
+    Passed as ChatOpenAI(rate_limiter=...), so LangChain calls are limited by the
+    same bucket as direct API requests to the same provider.
+    """
+    
+    def __init__(self, bucket: TokenBucket):
+        self.bucket = bucket
+    
+    def acquire(self, *, blocking: bool = True) -> bool:
+        if not blocking:
+            return self.bucket.try_acquire()
+        self.bucket.acquire()
+        return True
+    
+    async def aacquire(self, *, blocking: bool = True) -> bool:
+        if not blocking:
+            return self.bucket.try_acquire()
+        # The bucket sleeps to wait, so keep that off the event loop
+        await asyncio.to_thread(self.bucket.acquire)
+        return True
+
+
+@lru_cache(maxsize=1)
+def get_openrouter_limiter() -> TokenBucket:
+    """Return the process-wide OpenRouter bucket shared by every agent that calls it."""
+    return TokenBucket(Config.OPENROUTER_RPS, capacity=max(1.0, Config.OPENROUTER_RPS))
+
+
+@lru_cache(maxsize=1)
+def get_openrouter_token_limiter() -> Optional[TokenBucket]:
+    """Return the process-wide OpenRouter tokens-per-minute bucket, or None if unlimited."""
+    if Config.OPENROUTER_TPM <= 0:
+        return None
+    return TokenBucket(Config.OPENROUTER_TPM / 60.0, capacity=Config.OPENROUTER_TPM)
@@ -5,6 +5,8 @@ Test script for contact enrichment agent
 
 import sys
 import logging
+import orjson
+from langchain_core.messages import AIMessage
 from src.processors.contact_csv_processor import ContactCSVProcessor
 
 # Configure logging
@@ -72,16 +74,91 @@ def test_email_generation():
         ("Sarah Johnson", "google.com"),
         ("Michael Brown", "apple.com"),
         ("Emily Davis", "amazon.com"),
-        ("David Wilson", "meta.com")
+        ("David Wilson", "meta.com"),
+        ("Mary-Jane Smith", "acme.com")
     ]
     
     for name, domain in test_cases:
         email = agent.generate_work_email(name, domain)
         print(f"  {name} @ {domain} -> {email}")
     
+    # Hyphenated names keep their hyphen, as before
+    assert agent.generate_work_email("Mary-Jane Smith", "acme.com") == "mary-jane.smith@acme.com"
+    
     return True
 
 
+class _RecordedLLM:
+    """Stand-in chat model that replays one batched reply and counts its calls."""
+    
+    def __init__(self, reply):
+        self.reply = reply
+        self.calls = 0
+    
+    def invoke(self, messages):
+        self.calls += 1
+        return AIMessage(content=self.reply)
+
+
+def _offline_contact_agent(monkeypatch, searches, reply):
+    """Contact agent whose searches are recorded in searches and whose LLM replays reply."""
+    from src.agents.contact_agent import ContactEnrichmentAgent
+    
+    agent = ContactEnrichmentAgent()
+    monkeypatch.setattr(agent, "extract_company_domain", lambda company_name: "acme.com")
+    monkeypatch.setattr(agent, "search_contact", lambda name, company: searches.append(name) or {
+        "results": [{"title": f"{name} - Engineer - Acme", "url": "https://www.linkedin.com/in/jsmith",
+                     "description": "Engineer at Acme"}]
+    })
+    # Assigned directly, since monkeypatch would first build the real client
+    agent.llm = _RecordedLLM(reply)
+    return agent
+
+
+def test_batch_duplicate_contacts_share_extraction(monkeypatch):
+    """Test that a contact repeated in a batch costs one search and one LLM call."""
+    searches = []
+    agent = _offline_contact_agent(monkeypatch, searches, orjson.dumps([
+        {"idx": 1, "linkedin_url": "https://www.linkedin.com/in/jsmith", "current_job_title": "Engineer"}
+    ]).decode())
+    contacts = [{"contact_name": "John Smith", "company_name": "Acme"},
+                {"contact_name": "john smith ", "company_name": "ACME"}]
+    
+    enriched = agent.process_contacts_batch(contacts)
+    
+    assert [info.current_job_title for info in enriched] == ["Engineer", "Engineer"]
+    assert [info.contact_name for info in enriched] == ["John Smith", "john smith "]
+    assert searches == ["John Smith"]
+    assert agent.llm.calls == 1
+    
+    # A later batch is answered from the memo
+    agent.process_contacts_batch(contacts[:1])
+    assert searches == ["John Smith"]
+    assert agent.llm.calls == 1
+
+
+def test_batch_search_error_is_reported(monkeypatch):
+    """Test that a failed contact search is marked ERROR rather than NOT_FOUND."""
+    searches = []
+    agent = _offline_contact_agent(monkeypatch, searches, orjson.dumps([]).decode())
+    monkeypatch.setattr(agent, "search_contact", lambda name, company: searches.append(name) or {
+        "error": "Rate limit exceeded. Please try again later.", "results": []
+    })
+    contacts = [{"contact_name": "John Smith", "company_name": "Acme"},
+                {"contact_name": "Jane Doe", "company_name": "Acme"}]
+    
+    enriched = agent.process_contacts_batch(contacts)
+    
+    assert [info.linkedin_url for info in enriched] == ["ERROR", "ERROR"]
+    assert agent.llm.calls == 0
+    # Searched once in the batch and retried once on its own
+    assert sorted(searches) == ["Jane Doe", "Jane Doe", "John Smith", "John Smith"]
+    
+    # Failures are not remembered, so the next run searches again
+    agent.process_contacts_batch(contacts[:1])
+    assert searches.count("John Smith") == 4
+
+
 if __name__ == "__main__":
     print("=" * 60)
     print("CONTACT ENRICHMENT AGENT - TEST SUITE")
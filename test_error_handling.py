@@ -1,223 +1,276 @@
 #!/usr/bin/env python3
 """
-Test script to demonstrate error handling capabilities of the revenue agent.
+Tests for the error handling capabilities of the revenue agent.
+
+Run with pytest, or directly (arguments are passed through to pytest); with
+pytest-xdist installed the tests are spread across workers. Tests that need the
+agent are skipped when it is not configured.
 """
 
 import sys
 import os
+import importlib.util
+import time
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from src.agents.revenue_agent import DeepSeekRevenueAgent, ValidationError, APIError, ConfigurationError, DataProcessingError
-from src.tools.web_search import BraveWebSearch
-import logging
+import orjson
+import pytest
+from src.config.settings import Config
 
-# Configure logging to see error handling in action
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-logger = logging.getLogger(__name__)
+# (description, company name, company domain, raises ValidationError)
+VALIDATION_CASES = [
+    ("empty company name", "", None, True),
+    ("None company name", None, None, True),
+    ("very short company name", "A", None, True),
+    ("invalid domain format", "Apple Inc", "invalid-domain", False),  # Only a warning is logged
+    ("None domain", "Apple Inc", None, False),
+    ("empty string domain", "Apple Inc", "", False),
+    ("blank string domain from CSV", "Wincanton", "   ", False),
+    ("whitespace-only domain", "Black Sheep UK", "\t\n  \t", False)
+]
 
-def test_validation_errors():
-    """Test input validation error handling."""
-    print("\n" + "="*60)
-    print("TESTING INPUT VALIDATION ERROR HANDLING")
-    print("="*60)
+# Recorded Brave and DeepSeek responses replayed by test_graceful_degradation, so it runs offline
+RECORDED_SEARCH_RESPONSE = {
+    "web": {
+        "results": [
+            {
+                "title": "Apple Revenue, Employees & Company Profile",
+                "url": "https://www.zoominfo.com/c/apple-inc/21845005",
+                "description": "Apple Inc. reported annual revenue of $391.0 billion for fiscal year 2024.",
+                "age": "March 3, 2025"
+            }
+        ]
+    }
+}
+RECORDED_DEEPSEEK_RESPONSE = orjson.dumps({
+    "revenue_usd": 391035000000,
+    "source_url": "https://www.zoominfo.com/c/apple-inc/21845005",
+    "confidence": "high",
+    "reasoning": "Fiscal year 2024 annual revenue reported by ZoomInfo"
+}).decode()
+
+
+@pytest.fixture(scope="session")
+def agent():
+    """Revenue agent shared by every test in the session."""
+    from src.agents.revenue_agent import DeepSeekRevenueAgent, ConfigurationError
     
     try:
-        agent = DeepSeekRevenueAgent()
-        
-        # Test empty company name
-        print("\n1. Testing empty company name:")
-        try:
-            agent.search_company_financials("")
-        except ValidationError as e:
-            print(f"   ✓ Caught ValidationError: {e}")
-        
-        # Test None company name
-        print("\n2. Testing None company name:")
-        try:
-            agent.search_company_financials(None)
-        except ValidationError as e:
-            print(f"   ✓ Caught ValidationError: {e}")
-        
-        # Test very short company name
-        print("\n3. Testing very short company name:")
-        try:
-            agent.search_company_financials("A")
-        except ValidationError as e:
-            print(f"   ✓ Caught ValidationError: {e}")
-        
-        # Test invalid domain format
-        print("\n4. Testing invalid domain format:")
-        try:
-            agent.search_company_financials("Apple Inc", "invalid-domain")
-        except ValidationError as e:
-            print(f"   ✓ Caught ValidationError: {e}")
-        else:
-            print("   ✓ Warning logged for invalid domain format")
-        
-        # Test with None domain (should be allowed)
-        print("\n5. Testing with None domain (should be allowed):")
-        try:
-            agent.search_company_financials("Apple Inc", None)
-            print("   ✓ None domain accepted (optional parameter)")
-        except ValidationError as e:
-            print(f"   ✗ Unexpected ValidationError: {e}")
-        
-        # Test with empty string domain (should be allowed)
-        print("\n6. Testing with empty string domain (should be allowed):")
-        try:
-            agent.search_company_financials("Apple Inc", "")
-            print("   ✓ Empty string domain accepted (optional parameter)")
-        except ValidationError as e:
-            print(f"   ✗ Unexpected ValidationError: {e}")
-        
-        # Test with blank string domain from CSV (should be allowed)
-        print("\n7. Testing with blank string domain from CSV (should be allowed):")
-        try:
-            agent.search_company_financials("Wincanton", "   ")  # Blank string with spaces
-            print("   ✓ Blank string domain accepted (CSV empty cell)")
-        except ValidationError as e:
-            print(f"   ✗ Unexpected ValidationError: {e}")
-        
-        # Test with whitespace-only domain (should be treated as empty)
-        print("\n8. Testing with whitespace-only domain (should be treated as empty):")
-        try:
-            agent.search_company_financials("Black Sheep UK", "\t\n  \t")
-            print("   ✓ Whitespace-only domain accepted (treated as empty)")
-        except ValidationError as e:
-            print(f"   ✗ Unexpected ValidationError: {e}")
-        
-    except Exception as e:
-        print(f"   ✗ Unexpected error: {e}")
-
-def test_api_error_handling():
-    """Test API error handling."""
-    print("\n" + "="*60)
-    print("TESTING API ERROR HANDLING")
-    print("="*60)
+        return DeepSeekRevenueAgent()
+    except ConfigurationError as e:
+        pytest.skip(f"Revenue agent is not configured: {e}")
+
+
+@pytest.fixture
+def offline_agent(monkeypatch):
+    """Revenue agent whose Brave and DeepSeek calls replay the recorded responses."""
+    from src.agents.revenue_agent import DeepSeekRevenueAgent
     
-    try:
-        agent = DeepSeekRevenueAgent()
-        
-        # Test with invalid search results (empty string)
-        print("\n1. Testing revenue extraction with empty search results:")
-        try:
-            revenue, citation = agent.extract_revenue_from_sources("Apple Inc", "")
-        except ValidationError as e:
-            print(f"   ✓ Caught ValidationError: {e}")
-        
-        # Test with None search results
-        print("\n2. Testing revenue extraction with None search results:")
-        try:
-            revenue, citation = agent.extract_revenue_from_sources("Apple Inc", None)
-        except ValidationError as e:
-            print(f"   ✓ Caught ValidationError: {e}")
-        
-    except Exception as e:
-        print(f"   ✗ Unexpected error: {e}")
-
-def test_graceful_degradation():
-    """Test graceful degradation when services fail."""
-    print("\n" + "="*60)
-    print("TESTING GRACEFUL DEGRADATION")
-    print("="*60)
+    monkeypatch.setattr(Config, "OPENROUTER_API_KEY", Config.OPENROUTER_API_KEY or "test-key")
+    offline = DeepSeekRevenueAgent()
+    monkeypatch.setattr(offline.web_search, "search", lambda query, count=None: RECORDED_SEARCH_RESPONSE)
+    monkeypatch.setattr(offline, "_call_deepseek", lambda messages, **kwargs: RECORDED_DEEPSEEK_RESPONSE)
+    return offline
+
+
+@pytest.fixture(scope="session")
+def search_tool():
+    """Brave search tool shared by every test in the session."""
+    from src.tools.web_search import BraveWebSearch
+    
+    return BraveWebSearch()
+
+
+@pytest.fixture(scope="session")
+def tools():
+    """LangChain revenue tools shared by every test in the session."""
+    from src.agents.revenue_agent import ConfigurationError, create_revenue_agent_tools
     
     try:
-        agent = DeepSeekRevenueAgent()
-        
-        # Test complete analysis with a real company (this will show graceful handling)
-        print("\n1. Testing complete analysis with graceful error handling:")
-        result = agent.analyze_company_revenue("Apple Inc", "apple.com")
-        
-        print(f"   Company: {result['company_name']}")
-        print(f"   Status: {result.get('status', 'unknown')}")
-        print(f"   Revenue: {result.get('estimated_revenue_usd', 'Not found')}")
-        print(f"   Citation: {result.get('citation', 'No citation')[:100]}...")
-        
-        if result.get('error'):
-            print(f"   Error handled gracefully: {result['error']}")
-        
-    except Exception as e:
-        print(f"   ✗ Unexpected error: {e}")
-
-def test_web_search_error_handling():
+        return create_revenue_agent_tools()
+    except ConfigurationError as e:
+        pytest.skip(f"Revenue agent tools are not configured: {e}")
+
+
+@pytest.mark.parametrize(
+    "company_name,company_domain,raises",
+    [case[1:] for case in VALIDATION_CASES],
+    ids=[case[0] for case in VALIDATION_CASES]
+)
+def test_validation_errors(agent, company_name, company_domain, raises):
+    """Test input validation error handling."""
+    from src.agents.revenue_agent import ValidationError
+    
+    if raises:
+        # Rejected before any search is made, so exercise the validator directly
+        with pytest.raises(ValidationError):
+            agent._validate_input(company_name, company_domain)
+    else:
+        assert isinstance(agent.search_company_financials(company_name, company_domain), str)
+
+
+def test_search_rejects_invalid_input(agent):
+    """Test that the public search method surfaces validation errors."""
+    from src.agents.revenue_agent import ValidationError
+    
+    with pytest.raises(ValidationError):
+        agent.search_company_financials("")
+
+
+def test_api_error_handling(agent):
+    """Test API error handling."""
+    from src.agents.revenue_agent import ValidationError
+    
+    # Empty and None search results
+    for search_results in ("", None):
+        with pytest.raises(ValidationError):
+            agent.extract_revenue_from_sources("Apple Inc", search_results)
+
+
+def test_graceful_degradation(offline_agent):
+    """Test a complete analysis end to end against recorded responses."""
+    result = offline_agent.analyze_company_revenue("Apple Inc", "apple.com")
+    
+    assert result["company_name"] == "Apple Inc"
+    assert result["status"] == "success"
+    assert result["estimated_revenue_usd"] == 391035000000
+    assert result["citation"].startswith("https://www.zoominfo.com/c/apple-inc/21845005 (Confidence: high)")
+
+
+def test_partial_analysis_is_retried(offline_agent, monkeypatch):
+    """Test that a transient extraction failure is not remembered but a success is."""
+    from src.agents.revenue_agent import APIError
+    
+    calls = []
+    
+    def flaky_deepseek(messages, **kwargs):
+        calls.append(messages)
+        if len(calls) == 1:
+            raise APIError("API call failed after 3 attempts")
+        return RECORDED_DEEPSEEK_RESPONSE
+    
+    monkeypatch.setattr(offline_agent, "_call_deepseek", flaky_deepseek)
+    
+    assert offline_agent.analyze_company_revenue("Apple Inc", "apple.com")["status"] == "partial"
+    assert offline_agent.analyze_company_revenue("Apple Inc", "apple.com")["status"] == "success"
+    assert offline_agent.analyze_company_revenue("apple inc ", "APPLE.COM")["status"] == "success"
+    assert len(calls) == 2
+
+
+def test_batch_analysis_shares_cache(offline_agent, monkeypatch):
+    """Test that batched analyses reuse remembered results and retry partial ones."""
+    extracted = []
+    
+    def extract_revenues_batch(companies):
+        extracted.extend(name for name, _ in companies)
+        return [(391035000000 if name == "Apple Inc" else None, "citation") for name, _ in companies]
+    
+    monkeypatch.setattr(offline_agent, "extract_revenues_batch", extract_revenues_batch)
+    companies = [("Apple Inc", "apple.com"), ("Wincanton", "")]
+    
+    first = offline_agent.analyze_companies_batch(companies)
+    second = offline_agent.analyze_companies_batch(companies)
+    
+    assert [r["status"] for r in first] == [r["status"] for r in second] == ["success", "partial"]
+    assert extracted == ["Apple Inc", "Wincanton", "Wincanton"]
+    assert offline_agent.analyze_company_revenue("Apple Inc", "apple.com")["estimated_revenue_usd"] == 391035000000
+
+
+def test_retry_after_is_clamped(monkeypatch):
+    """Test that a 429's Retry-After header is honoured but capped at the retry's max delay."""
+    import requests
+    from src.agents import revenue_agent
+    from src.util.rate_limit import TokenBucket
+    
+    def response(status_code, content=b"", headers=None):
+        resp = requests.Response()
+        resp.status_code = status_code
+        resp._content = content
+        resp.headers.update(headers or {})
+        return resp
+    
+    responses = iter([
+        response(429, headers={"Retry-After": "3600"}),
+        response(200, orjson.dumps({"choices": [{"message": {"content": RECORDED_DEEPSEEK_RESPONSE}}]}))
+    ])
+    sleeps = []
+    monkeypatch.setattr(Config, "OPENROUTER_API_KEY", Config.OPENROUTER_API_KEY or "test-key")
+    monkeypatch.setattr(revenue_agent._session, "post", lambda *args, **kwargs: next(responses))
+    monkeypatch.setattr(revenue_agent.time, "sleep", sleeps.append)
+    # Keep the shared rate limiters from adding sleeps of their own
+    monkeypatch.setattr(revenue_agent, "get_openrouter_limiter", lambda: TokenBucket(1000.0, capacity=10.0))
+    monkeypatch.setattr(revenue_agent, "get_openrouter_token_limiter", lambda: None)
+    
+    live_agent = revenue_agent.DeepSeekRevenueAgent()
+    live_agent.response_cache = None
+    
+    assert live_agent._call_deepseek([{"role": "user", "content": "Apple Inc"}]) == RECORDED_DEEPSEEK_RESPONSE
+    assert sleeps == [30.0]
+
+
+@pytest.mark.parametrize(
+    "revenue,expected",
+    [
+        (5000000, 5000000.0),
+        ("5000000", 5000000.0),
+        (-5000000, None),
+        ("-5000000", None),
+        (float("nan"), None),
+        ("nan", None),
+        (True, None),
+        ("unknown", None),
+        (None, None)
+    ],
+    ids=["number", "numeric string", "negative", "negative string", "nan", "nan string", "bool",
+         "non-numeric string", "missing"]
+)
+def test_revenue_parsing(offline_agent, revenue, expected):
+    """Test that model revenue values are coerced or rejected like the original float() parsing."""
+    parsed, _ = offline_agent._parse_revenue_data({"revenue_usd": revenue})
+    assert parsed == expected
+
+
+def test_web_search_error_handling(search_tool):
     """Test web search error handling."""
-    print("\n" + "="*60)
-    print("TESTING WEB SEARCH ERROR HANDLING")
-    print("="*60)
+    # Empty and None queries
+    assert "error" in search_tool.search("")
+    assert "error" in search_tool.search(None)
     
-    try:
-        search_tool = BraveWebSearch()
-        
-        # Test with empty query
-        print("\n1. Testing search with empty query:")
-        result = search_tool.search("")
-        if "error" in result:
-            print(f"   ✓ Error handled: {result['error']}")
-        
-        # Test with None query
-        print("\n2. Testing search with None query:")
-        result = search_tool.search(None)
-        if "error" in result:
-            print(f"   ✓ Error handled: {result['error']}")
-        
-        # Test company revenue search with invalid input
-        print("\n3. Testing company revenue search with invalid input:")
-        results = search_tool.search_company_revenue("")
-        print(f"   ✓ Returned empty results: {len(results)} results")
-        
-    except Exception as e:
-        print(f"   ✗ Unexpected error: {e}")
-
-def test_tool_error_handling():
+    # Company revenue search with invalid input
+    assert search_tool.search_company_revenue("") == []
+
+
+def test_tool_error_handling(tools):
     """Test LangChain tool error handling."""
-    print("\n" + "="*60)
-    print("TESTING LANGCHAIN TOOL ERROR HANDLING")
-    print("="*60)
+    search_company_financials, extract_revenue_from_sources = tools
     
-    try:
-        from src.agents.revenue_agent import create_revenue_agent_tools
-        
-        tools = create_revenue_agent_tools()
-        search_tool, extract_tool = tools
-        
-        # Test search tool with invalid input
-        print("\n1. Testing search tool with invalid input:")
-        result = search_tool.invoke({"company_name": "", "company_domain": ""})
-        print(f"   ✓ Tool handled error gracefully: {result[:100]}...")
-        
-        # Test extract tool with invalid input
-        print("\n2. Testing extract tool with invalid input:")
-        result = extract_tool.invoke({"company_name": "", "search_results": ""})
-        print(f"   ✓ Tool handled error gracefully: {result[:100]}...")
-        
-    except Exception as e:
-        print(f"   ✗ Unexpected error: {e}")
-
-def main():
-    """Run all error handling tests."""
-    print("REVENUE AGENT ERROR HANDLING TEST SUITE")
-    print("="*60)
-    print("This script tests the comprehensive error handling")
-    print("capabilities added to the revenue agent.")
+    # Search tool with invalid input
+    result = search_company_financials.invoke({"company_name": "", "company_domain": ""})
+    assert result.startswith("Validation error")
     
-    try:
-        test_validation_errors()
-        test_api_error_handling()
-        test_graceful_degradation()
-        test_web_search_error_handling()
-        test_tool_error_handling()
-        
-        print("\n" + "="*60)
-        print("ALL TESTS COMPLETED")
-        print("="*60)
-        print("✓ Error handling is working correctly!")
-        print("✓ The agent gracefully handles various error conditions")
-        print("✓ Logging provides detailed information for debugging")
-        print("✓ Custom exceptions provide clear error categorization")
-        
-    except Exception as e:
-        print(f"\n✗ Test suite failed with error: {e}")
-        logger.error(f"Test suite failed: {e}")
+    # Extract tool with invalid input
+    result = orjson.loads(extract_revenue_from_sources.invoke({"company_name": "", "search_results": ""}))
+    assert result["status"] == "failed"
+    assert result["revenue_usd"] is None
+
+
+class _JsonSummary:
+    """pytest plugin that ends a direct run with one JSON line for CI log parsers."""
+    
+    def pytest_sessionstart(self, session):
+        self.started = time.perf_counter()
+    
+    def pytest_terminal_summary(self, terminalreporter):
+        summary = {"suite": "error_handling"}
+        for outcome in ("passed", "failed", "skipped", "error"):
+            summary[outcome] = len(terminalreporter.stats.get(outcome, []))
+        summary["duration_s"] = round(time.perf_counter() - self.started, 3)
+        terminalreporter.write_line(orjson.dumps(summary).decode())
+
 
 if __name__ == "__main__":
-    main()
+    # Extra arguments go to pytest, e.g. --lf to re-run only the tests that failed last time
+    args = [__file__, *sys.argv[1:]]
+    if importlib.util.find_spec("xdist"):
+        args += ["-n", "auto"]
+    sys.exit(pytest.main(args, plugins=[_JsonSummary()]))